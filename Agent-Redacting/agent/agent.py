@@ -1,8 +1,12 @@
 #agent/agent.py
 from computers import Computer, LocalPlaywrightComputer
-from utils import create_response, show_image
+from utils import show_image
+from client import ResponsesClient, get_client
 import json
-from typing import Callable
+from typing import Callable, Optional
+
+# 1x1 white PNG that stands in for screenshots dropped by the retention policy.
+PLACEHOLDER_IMAGE_URL = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGP4DwABAQEAsTj2FAAAAABJRU5ErkJggg=="
 
 
 class Agent:
@@ -12,9 +16,26 @@ class Agent:
         computer: Computer = None,
         tools: list[dict] = [],
         acknowledge_safety_check_callback: Callable = lambda: False,
+        client: ResponsesClient = None,
+        chained: bool = False,
+        keep_screenshots: Optional[int] = None,
+        batch_actions: bool = False,
     ):
+        """
+        chained: send only the new items plus previous_response_id and let the server keep
+            the history. run_full_turn then expects only this turn's new input items.
+        keep_screenshots: in the default stateless mode, only the last N screenshots are
+            sent in full; older ones are swapped for a 1x1 placeholder.
+        batch_actions: run every computer_call of a response first and take a single
+            screenshot afterwards, shared by all of their outputs.
+        """
         self.model = model
         self.computer = computer
+        self.client = client or get_client()
+        self.chained = chained
+        self.keep_screenshots = keep_screenshots
+        self.batch_actions = batch_actions
+        self.previous_response_id = None
         self.tools = tools
         self.print_steps = True
         self.debug = False
@@ -44,6 +65,41 @@ class Agent:
             f.write(message + "\n")
     # write_log("🚀 Script started...")
 
+    async def run_computer_call(self, item):
+        """Runs a computer_call's action and its safety checks; returns the checks to acknowledge."""
+        action = item["action"]
+        action_type = action["type"]
+        action_args = {k: v for k, v in action.items() if k != "type"}
+        if self.print_steps:
+            print(f"{action_type}({action_args})")
+
+        await getattr(self.computer, action_type)(**action_args)
+
+        # Preserve any specialized handling for specific actions.
+        if action_type == "click" and action_args.get("button") == "wheel":
+            print("🖱️ Handling wheel click...")
+
+        # Process pending safety checks.
+        pending_checks = item.get("pending_safety_checks") or []
+        for check in pending_checks:
+            message = check["message"]
+            if not self.acknowledge_safety_check_callback(message):
+                raise ValueError(
+                    f"Safety check failed: {message}. Cannot continue with unacknowledged safety checks."
+                )
+        return pending_checks
+
+    def computer_call_output(self, item, pending_checks, screenshot_base64):
+        return {
+            "type": "computer_call_output",
+            "call_id": item["call_id"],
+            "acknowledged_safety_checks": pending_checks,
+            "output": {
+                "type": "input_image",
+                "image_url": f"data:image/png;base64,{screenshot_base64}",
+            },
+        }
+
     async def handle_item(self, item):
         """Handle each item; may cause a computer action + screenshot."""
         if item["type"] == "message":
@@ -69,77 +125,47 @@ class Agent:
             return []
     
         if item["type"] == "computer_call":
-            action = item["action"]
-            action_type = action["type"]
-            action_args = {k: v for k, v in action.items() if k != "type"}
-            if self.print_steps:
-                print(f"{action_type}({action_args})")
-    
-            await getattr(self.computer, action_type)(**action_args)
-    
-            # Preserve any specialized handling for specific actions.
-            if action_type == "click" and action_args.get("button") == "wheel":
-                print("🖱️ Handling wheel click...")
-    
+            pending_checks = await self.run_computer_call(item)
             screenshot_base64 = await self.computer.screenshot()
             if self.show_images:
                 show_image(screenshot_base64)
-    
-            # Process pending safety checks.
-            # Support both the singular and plural key formats, merging them if needed.
-            # ack_checks = []
-            # if "pending_safety_check" in item:
-            #     pending = item["pending_safety_check"]
-            #     if isinstance(pending, dict):
-            #         ack_checks.append(pending)
-            #     elif isinstance(pending, list):
-            #         ack_checks.extend(pending)
-            #     else:
-            #         print("Unexpected pending_safety_check format:", pending)
-    
-            pending_checks = item.get("pending_safety_checks")
-            # if pending_checks:
-            #     if isinstance(pending_checks, dict):
-            #         ack_checks.append(pending_checks)
-            #     elif isinstance(pending_checks, list):
-            #         ack_checks.extend(pending_checks)
-    
-            for check in ack_checks:
-                message = check["message"]
-                if not self.acknowledge_safety_check_callback(message):
-                    raise ValueError(
-                        f"Safety check failed: {message}. Cannot continue with unacknowledged safety checks."
-                    )
-    
-            return [
-                {
-                    "type": "computer_call_output",
-                    "call_id": item["call_id"],
-                    "acknowledged_safety_checks": pending_checks,
-                    "output": {
-                        "type": "input_image",
-                        "image_url": f"data:image/png;base64,{screenshot_base64}",
-                    },
-
-                }
-            ]
+            return [self.computer_call_output(item, pending_checks, screenshot_base64)]
         return []
 
 
 
+    def prune_screenshots(self, items):
+        """Returns items with all but the last keep_screenshots screenshots replaced by a placeholder."""
+        if self.keep_screenshots is None:
+            return items
+        shots = [i for i, item in enumerate(items) if item.get("type") == "computer_call_output"]
+        drop = set(shots[:max(0, len(shots) - self.keep_screenshots)])
+        return [
+            {**item, "output": {**item["output"], "image_url": PLACEHOLDER_IMAGE_URL}} if i in drop else item
+            for i, item in enumerate(items)
+        ]
+
     async def run_full_turn(self, input_items, print_steps=True, debug=False, show_images=False):
         self.print_steps = print_steps
         self.debug = debug
         self.show_images = show_images
         new_items = []
+        unsent = list(input_items)  # chained mode: items the server has not seen yet
         while new_items[-1].get("role") != "assistant" if new_items else True:
-            self.debug_print(input_items + new_items)
+            if self.chained:
+                payload = unsent
+                extra = {"previous_response_id": self.previous_response_id} if self.previous_response_id else {}
+            else:
+                payload = self.prune_screenshots(input_items + new_items)
+                extra = {}
+            self.debug_print(payload)
     
-            response = create_response(
+            response = await self.client.create(
                 model=self.model,
-                input=input_items + new_items,
+                input=payload,
                 tools=self.tools,
                 truncation="auto",
+                **extra,
             )
             self.debug_print(response)
     
@@ -147,9 +173,24 @@ class Agent:
                 print(response)
                 raise ValueError("No output from model")
     
+            self.previous_response_id = response.get("id")
             new_items += response["output"]
+            unsent = []
+            deferred = []  # (computer_call, pending checks) waiting for the shared screenshot
             for item in response["output"]:
-                new_items += await self.handle_item(item)
+                if self.batch_actions and item["type"] == "computer_call":
+                    deferred.append((item, await self.run_computer_call(item)))
+                    continue
+                outputs = await self.handle_item(item)
+                new_items += outputs
+                unsent += outputs
+            if deferred:
+                screenshot_base64 = await self.computer.screenshot()
+                if self.show_images:
+                    show_image(screenshot_base64)
+                outputs = [self.computer_call_output(item, checks, screenshot_base64) for item, checks in deferred]
+                new_items += outputs
+                unsent += outputs
     
         return new_items
 
@@ -0,0 +1,29 @@
+#benchmarks/_stats.py
+import os
+import statistics
+import sys
+
+# Benchmarks run as scripts from Agent-Redacting/; make its packages importable.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(samples_ms):
+    """p50/p95/mean latency (ms) and throughput (ops/s) for a list of timings."""
+    mean = statistics.fmean(samples_ms) if samples_ms else 0.0
+    return {
+        "n": len(samples_ms),
+        "mean_ms": mean,
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "throughput_per_s": 1000.0 / mean if mean else 0.0,
+    }
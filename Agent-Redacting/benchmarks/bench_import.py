@@ -0,0 +1,75 @@
+#benchmarks/bench_import.py
+"""Import-time budget for the entry points: fresh interpreter per sample, nothing heavy loaded.
+
+    python benchmarks/bench_import.py --budget benchmarks/budget.json
+
+Each sample imports one module in a new `python` process and reports how long the
+import took and which heavy dependencies ended up in sys.modules. Exits non-zero
+when a module pulls in one of HEAVY_MODULES at import, or its p95 exceeds the
+"imports" budget (ms).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from _stats import summarize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["main2", "runner", "utils", "redaction", "agent"]
+# Loaded on first use only; importing an entry point must not pull these in.
+HEAVY_MODULES = ["cv2", "numpy", "pytesseract", "tesserocr", "nest_asyncio", "PIL", "requests", "openai"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def sample(module):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--budget", help="JSON file with an {\"imports\": {module: p95_ms}} group")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results, failures = {}, []
+    for module in args.modules:
+        samples = [sample(module) for _ in range(args.iterations)]
+        heavy = sorted({m for s in samples for m in s["heavy"]})
+        results[module] = {**summarize([s["ms"] for s in samples]), "heavy": heavy}
+        r = results[module]
+        print(f"{module:>10}: p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.budget:
+        with open(args.budget) as f:
+            limits = json.load(f).get("imports", {})
+        for module, limit_ms in limits.items():
+            if module in results and results[module]["p95_ms"] > limit_ms:
+                failures.append(f"imports.{module}: p95 {results[module]['p95_ms']:.1f} ms > {limit_ms} ms")
+    for failure in failures:
+        print("❌ " + failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
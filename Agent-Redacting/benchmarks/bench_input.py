@@ -0,0 +1,80 @@
+#benchmarks/bench_input.py
+"""Times typing and dragging on the fixture site, per-key vs bulk input.
+
+    python benchmarks/bench_input.py --sizes 1024 4096 16384 --json input_results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from _stats import summarize
+from computers import HeadlessPlaywrightComputer
+from suite import FIXTURE_URL
+
+CODE_LINE = "    result = [value * 2 for value in values if value % 3 == 0]  # keep multiples\n"
+
+
+async def time_typing(computer, text, mode, repeat):
+    computer.type_mode = mode
+    samples = []
+    for _ in range(repeat):
+        await computer._page.fill("#editor", "")
+        await computer._page.focus("#editor")
+        start = time.perf_counter()
+        await computer.type(text)
+        samples.append((time.perf_counter() - start) * 1000)
+        typed = await computer._page.input_value("#editor")
+        if typed != text:
+            raise AssertionError(f"{mode}: editor holds {len(typed)} chars, expected {len(text)}")
+    return summarize(samples)
+
+
+async def time_drag(computer, path, tolerance, step, repeat):
+    computer.drag_tolerance, computer.drag_step = tolerance, step
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await computer.drag(path)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def run(args):
+    results = {"typing": {}, "drag": {}}
+    async with HeadlessPlaywrightComputer(start_url=FIXTURE_URL) as computer:
+        for size in args.sizes:
+            text = (CODE_LINE * (size // len(CODE_LINE) + 1))[:size]
+            for mode in ("keys", "insert"):
+                r = await time_typing(computer, text, mode, args.repeat)
+                r["chars_per_s"] = size / (r["mean_ms"] / 1000) if r["mean_ms"] else 0.0
+                results["typing"][f"{mode}_{size}"] = r
+
+        # A wobbly 200-point hand-drawn path across the drag area.
+        rng = random.Random(0)
+        path = [[40 + i * 2.5, 640 + rng.uniform(-1.5, 1.5)] for i in range(200)]
+        results["drag"]["per_point"] = await time_drag(computer, path, 0, 0, args.repeat)
+        results["drag"]["simplified"] = await time_drag(computer, path, 2.0, None, args.repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 4096, 16384])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for group, entries in results.items():
+        for name, r in entries.items():
+            extra = f"  {r['chars_per_s']:10.0f} chars/s" if "chars_per_s" in r else ""
+            print(f"{group:>6} {name:>14}: mean {r['mean_ms']:9.1f} ms  p95 {r['p95_ms']:9.1f} ms{extra}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#benchmarks/bench_ocr.py
+"""Compares OCR backends and detection-only text locators on recorded frames.
+
+Record frames by setting RECORD_FRAMES_DIR in main2.py, then run from Agent-Redacting/:
+
+    python benchmarks/bench_ocr.py recorded_frames/ --backends pytesseract tesserocr
+    python benchmarks/bench_ocr.py recorded_frames/ --backends pytesseract morph db
+
+The first backend is the reference: coverage is the share of its word pixels the
+other backend also redacts, painted_pct the share of the frame each one paints over.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from _stats import percentile
+import cv2
+import numpy as np
+from redaction import get_backend
+
+
+def load_frames(folder, limit=None):
+    names = sorted(n for n in os.listdir(folder) if n.lower().endswith(".png"))[:limit]
+    frames = []
+    for n in names:
+        img = cv2.imread(os.path.join(folder, n), cv2.IMREAD_COLOR)
+        if img is not None:
+            frames.append(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    return frames
+
+
+def coverage(reference, boxes, shape):
+    """Fraction of the reference boxes' pixels that `boxes` also cover."""
+    ref = np.zeros(shape[:2], dtype=bool)
+    got = np.zeros(shape[:2], dtype=bool)
+    for x, y, w, h in reference:
+        ref[y:y + h, x:x + w] = True
+    for x, y, w, h in boxes:
+        got[y:y + h, x:x + w] = True
+    total = ref.sum()
+    return float((ref & got).sum() / total) if total else 1.0
+
+
+def painted(boxes, shape):
+    mask = np.zeros(shape[:2], dtype=bool)
+    for x, y, w, h in boxes:
+        mask[y:y + h, x:x + w] = True
+    return float(mask.mean() * 100)
+
+
+def run(frames, backends, repeat):
+    results = {}
+    reference = None
+    for name in backends:
+        start = time.perf_counter()
+        backend = get_backend(name)
+        load_ms = (time.perf_counter() - start) * 1000
+        timings, per_frame = [], []
+        for img in frames:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                boxes = backend.word_boxes(img)
+                timings.append((time.perf_counter() - start) * 1000)
+            per_frame.append(boxes)
+        if reference is None:
+            reference = per_frame
+        results[name] = {
+            "load_ms": load_ms,
+            "mean_ms": statistics.fmean(timings),
+            "p50_ms": percentile(timings, 50),
+            "p95_ms": percentile(timings, 95),
+            "boxes_per_frame": statistics.fmean(len(b) for b in per_frame),
+            "painted_pct": statistics.fmean(painted(b, img.shape) for b, img in zip(per_frame, frames)),
+            "coverage_vs_" + backends[0]: statistics.fmean(
+                coverage(ref, got, img.shape) for ref, got, img in zip(reference, per_frame, frames)
+            ),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("frames", help="folder of recorded PNG screenshots")
+    parser.add_argument("--backends", nargs="+", default=["pytesseract", "tesserocr"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        sys.exit(f"No PNG frames found in {args.frames}")
+    results = run(frames, args.backends, args.repeat)
+
+    print(f"{len(frames)} frames x {args.repeat} runs")
+    for name, r in results.items():
+        print(f"{name:>12}: " + "  ".join(f"{k}={v:.2f}" for k, v in r.items()))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
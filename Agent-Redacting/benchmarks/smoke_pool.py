@@ -0,0 +1,88 @@
+#benchmarks/smoke_pool.py
+"""Smoke run of OcrPool with a stub backend, so it needs no OCR engine installed.
+
+    python benchmarks/smoke_pool.py --workers 4
+
+Draws dark "lines of text" up to the pool's max_line_height (less a blank row
+above and below, which OCR needs too) across the strip boundaries, and runs the
+frame through OcrPool. The stub backend behaves like OCR that can't read a cut
+word: it reports each band of dark rows, except bands touching the top or bottom
+of its tile. Exits non-zero when a worker dies or a dark pixel is left outside
+every returned box.
+"""
+import argparse
+import asyncio
+import sys
+
+import _stats  # noqa: F401  (puts Agent-Redacting/ on sys.path)
+import numpy as np
+from redaction.ocr import BACKENDS
+from redaction.pool import OcrPool, split_tiles
+
+
+class StubBackend:
+    def word_boxes(self, img_rgb: np.ndarray):
+        ink = (img_rgb < 128).any(axis=2)
+        rows = ink.any(axis=1)
+        boxes, y = [], 0
+        while y < len(rows):
+            if not rows[y]:
+                y += 1
+                continue
+            end = y
+            while end < len(rows) and rows[end]:
+                end += 1
+            if y > 0 and end < len(rows):  # cut by the tile edge: unreadable
+                cols = np.flatnonzero(ink[y:end].any(axis=0))
+                boxes.append((int(cols[0]), y, int(cols[-1]) - int(cols[0]) + 1, end - y))
+            y = end
+        return boxes
+
+
+# Module level, so spawned workers (which re-import this script) know it too.
+BACKENDS["stub"] = StubBackend
+
+
+def make_frame(height: int, width: int, rows: int, max_line_height: int) -> np.ndarray:
+    """White frame with lines up to max_line_height - 2 tall across each strip boundary."""
+    frame = np.full((height, width, 3), 255, dtype=np.uint8)
+    for r in range(1, rows):
+        boundary = r * height // rows
+        heights = list(range(8, max_line_height - 2, 8)) + [max_line_height - 2]
+        for i, h in enumerate(heights):
+            x = 4 + (i * 12) % (width - 12)
+            y = boundary - h // 2
+            frame[max(1, y):min(height - 1, y + h), x:x + 8] = 0
+    return frame
+
+
+def uncovered(frame: np.ndarray, boxes) -> int:
+    left = (frame < 128).any(axis=2)
+    for x, y, w, h in boxes:
+        left[y:y + h, x:x + w] = False
+    return int(left.sum())
+
+
+async def run(args) -> int:
+    with OcrPool(workers=args.workers, backend="stub", max_line_height=args.max_line_height) as pool:
+        rows = max(1, min(pool.workers, args.height // pool.min_tile_height))
+        frame = make_frame(args.height, args.width, rows, args.max_line_height)
+        boxes = await pool.word_boxes(frame)
+    strips = len(split_tiles(args.height, args.width, rows, overlap=args.max_line_height))
+    missed = uncovered(frame, boxes)
+    print(f"{strips} strips, {len(boxes)} boxes, {missed} dark pixels uncovered")
+    return 1 if missed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=2048)
+    parser.add_argument("--max-line-height", type=int, default=160)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
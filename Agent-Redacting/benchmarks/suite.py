@@ -0,0 +1,178 @@
+#benchmarks/suite.py
+"""Offline benchmark for the redaction pipeline and the computer actions.
+
+Drives headless Chromium against the static fixture site in benchmarks/fixtures/site,
+records a corpus of screenshots from it (or uses --frames, e.g. RECORD_FRAMES_DIR
+output from main2.py), and times every stage. Run from Agent-Redacting/:
+
+    python benchmarks/suite.py --output bench_results.json
+    python benchmarks/suite.py --frames recorded_frames/ --skip-actions --budget benchmarks/budget.json
+
+With --budget, exits non-zero when any measured p95 exceeds its budget (ms).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+from _stats import summarize
+import cv2
+import numpy as np
+from computers import HeadlessPlaywrightComputer
+from redaction import DEFAULT_RULES, FrameEncoder, fill_boxes, get_backend
+
+FIXTURE_URL = (Path(__file__).parent / "fixtures" / "site" / "index.html").absolute().as_uri()
+
+
+async def record_corpus(computer, scroll_steps: int = 8):
+    """Screenshots of the fixture at several scroll offsets and states, as PNG bytes."""
+    frames = [await computer.screenshot_bytes()]
+    await computer.click(60, 300)
+    frames.append(await computer.screenshot_bytes())
+    for _ in range(scroll_steps):
+        await computer.scroll(512, 400, 0, 300)
+        frames.append(await computer.screenshot_bytes())
+    await computer.goto(FIXTURE_URL)
+    return frames
+
+
+def load_frames(folder):
+    return [p.read_bytes() for p in sorted(Path(folder).glob("*.png"))]
+
+
+async def timed(samples, name, coro):
+    start = time.perf_counter()
+    await coro
+    samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+
+async def bench_actions(computer, iterations: int):
+    """Times every computer action against the fixture page."""
+    samples = {}
+    editor = await computer._page.query_selector("#editor")
+    box = await editor.bounding_box()
+    ex, ey = int(box["x"] + 20), int(box["y"] + 20)
+    for _ in range(iterations):
+        await timed(samples, "screenshot", computer.screenshot())
+        await timed(samples, "screenshot_bytes", computer.screenshot_bytes())
+        await timed(samples, "move", computer.move(300, 300))
+        await timed(samples, "click", computer.click(ex, ey))
+        await timed(samples, "type", computer.type("print('hello world')"))
+        await timed(samples, "keypress", computer.keypress(["ctrl", "a"]))
+        await timed(samples, "double_click", computer.double_click(ex, ey))
+        await timed(samples, "drag", computer.drag([[30, 630], [200, 630], [400, 630]]))
+        await timed(samples, "scroll", computer.scroll(512, 400, 0, 400))
+        await timed(samples, "wait_until_stable", computer.wait_until_stable(timeout_ms=1000))
+        await timed(samples, "goto", computer.goto(FIXTURE_URL))
+    return samples
+
+
+def bench_redaction(frames, iterations: int, backend: str, encoder: FrameEncoder):
+    """Times each stage of capture_and_display on every frame."""
+    ocr = get_backend(backend)
+    samples = {}
+
+    def clock(name, start):
+        now = time.perf_counter()
+        samples.setdefault(name, []).append((now - start) * 1000)
+        return now
+
+    for _ in range(iterations):
+        for png in frames:
+            t0 = t = time.perf_counter()
+            img = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_COLOR)
+            t = clock("decode", t)
+            DEFAULT_RULES.apply_colors(img)
+            t = clock("colour_mask", t)
+            boxes = ocr.word_boxes(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+            t = clock("ocr", t)
+            fill_boxes(img, boxes)
+            DEFAULT_RULES.apply_bands(img)
+            t = clock("box_fill", t)
+            encoder.encode(img)
+            t = clock("encode", t)
+            clock("total", t0)
+    return samples
+
+
+def check_budget(results, budget):
+    """Returns a list of "group.name p95 > budget" strings for every blown budget."""
+    failures = []
+    for group, limits in budget.items():
+        for name, limit_ms in limits.items():
+            measured = results.get(group, {}).get(name)
+            if measured and measured["p95_ms"] > limit_ms:
+                failures.append(f"{group}.{name}: p95 {measured['p95_ms']:.1f} ms > {limit_ms} ms")
+    return failures
+
+
+async def run(args):
+    frames = load_frames(args.frames) if args.frames else []
+    actions = {}
+    if not args.skip_actions or not frames:
+        async with HeadlessPlaywrightComputer(start_url=FIXTURE_URL) as computer:
+            if not frames:
+                frames = await record_corpus(computer)
+            if not args.skip_actions:
+                actions = await bench_actions(computer, args.iterations)
+    if args.save_corpus:
+        os.makedirs(args.save_corpus, exist_ok=True)
+        for i, png in enumerate(frames):
+            Path(args.save_corpus, f"{i:04d}.png").write_bytes(png)
+
+    encoder = FrameEncoder(format=args.format, quality=args.quality)
+    stages = bench_redaction(frames, args.iterations, args.backend, encoder)
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "frames": len(frames),
+            "iterations": args.iterations,
+            "ocr_backend": args.backend,
+            "output_format": args.format,
+        },
+        "stages": {name: summarize(s) for name, s in stages.items()},
+        "actions": {name: summarize(s) for name, s in actions.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="folder of recorded PNG screenshots (default: record from the fixture)")
+    parser.add_argument("--save-corpus", help="write the frames used to this folder")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--backend", default="auto", help="OCR backend (see redaction.ocr.BACKENDS)")
+    parser.add_argument("--format", default="png", choices=sorted(FrameEncoder.FORMATS))
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--skip-actions", action="store_true", help="only benchmark the redaction stages")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--budget", help="JSON file of {group: {name: p95_ms}} limits")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for group in ("stages", "actions"):
+        for name, r in results[group].items():
+            print(f"{group:>7} {name:>18}: p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+                  f"{r['throughput_per_s']:8.1f}/s")
+    print(f"Results written to {args.output}")
+
+    if args.budget:
+        with open(args.budget) as f:
+            failures = check_budget(results, json.load(f))
+        for failure in failures:
+            print("❌ " + failure)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
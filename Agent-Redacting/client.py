@@ -0,0 +1,112 @@
+#client.py
+import asyncio
+import os
+import random
+from typing import Callable, Optional
+import httpx
+from tracing import tracer
+
+# Statuses worth another attempt; everything else (400, 401, 403, 404, 422...) fails at once.
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"{status_code}: {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class ResponsesClient:
+    """Async client for the Responses API, shared by main2.py and Agent.
+
+    One httpx.AsyncClient keeps a pool of keep-alive connections. Requests time out
+    instead of hanging, and retryable failures (timeouts, connection errors,
+    RETRY_STATUSES) back off exponentially with full jitter, honouring Retry-After.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        organization: Optional[str] = None,
+        base_url: str = "https://api.openai.com/v1",
+        timeout: float = 120.0,
+        connect_timeout: float = 10.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        max_connections: int = 20,
+        on_retry: Optional[Callable[[int, Exception, float], None]] = None,
+    ):
+        headers = {
+            "Authorization": f"Bearer {api_key or os.getenv('OPENAI_API_KEY')}",
+            "Content-Type": "application/json",
+            "Openai-beta": "responses=v1",
+        }
+        organization = organization or os.getenv("OPENAI_ORG")
+        if organization:
+            headers["Openai-Organization"] = organization
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_retry = on_retry
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def create(self, **kwargs) -> dict:
+        """POST /responses and return the parsed JSON body."""
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with tracer.span("responses.create", attempt=attempt + 1):
+                    resp = await self._client.post("/responses", json=kwargs)
+            except httpx.TransportError as e:  # timeouts and connection failures
+                error = e
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                error = APIError(resp.status_code, resp.text)
+                if resp.status_code not in RETRY_STATUSES:
+                    raise error
+                retry_after = resp.headers.get("retry-after")
+            if attempt == self.max_retries:
+                raise error
+            delay = self.backoff(attempt, retry_after)
+            if self.on_retry:
+                self.on_retry(attempt + 1, error, delay)
+            await asyncio.sleep(delay)
+
+
+_shared: Optional[ResponsesClient] = None
+
+
+def get_client() -> ResponsesClient:
+    """Process-wide client, created on first use, so every caller shares one connection pool."""
+    global _shared
+    if _shared is None:
+        from dotenv import load_dotenv
+        load_dotenv()  # OPENAI_API_KEY / OPENAI_ORG may come from .env (utils.py no longer loads it at import)
+        _shared = ResponsesClient()
+    return _shared
@@ -1,3 +1,5 @@
 from .computer import Computer
 from .base_playwright import BasePlaywrightComputer
 from .local_playwright import LocalPlaywrightComputer
+from .headless_playwright import HeadlessPlaywrightComputer
+from .pool import BrowserContextPool
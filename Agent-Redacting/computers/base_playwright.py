@@ -1,8 +1,9 @@
 #computers/base_playwright.py
 import asyncio
 import base64
+import math
 import time
-from typing import List, Dict, Literal
+from typing import List, Dict, Literal, Optional
 from playwright.async_api import async_playwright, Browser, Page
 
 CUA_KEY_TO_PLAYWRIGHT_KEY = {
@@ -33,20 +34,113 @@ CUA_KEY_TO_PLAYWRIGHT_KEY = {
     "win": "Meta",
 }
 
+# Resolves once every finite CSS/Web animation has finished, or after `cap` ms.
+WAIT_FOR_ANIMATIONS_JS = """
+cap => Promise.race([
+    Promise.all(
+        document.getAnimations()
+            .filter(a => a.playState === "running" && a.effect && a.effect.getTiming().iterations !== Infinity)
+            .map(a => a.finished.catch(() => null))
+    ),
+    new Promise(resolve => setTimeout(resolve, cap)),
+])
+"""
+
+# Client rects of every visible text node (plus form fields) in the viewport, and of the
+# elements whose pixels the DOM can't describe, descending into open shadow roots. One
+# round trip; rects are viewport CSS px, returned with the scroll offset they belong to.
+TEXT_RECTS_JS = """
+() => {
+    const W = innerWidth, H = innerHeight, text = [], opaque = [];
+    const push = (out, r) => {
+        const x0 = Math.max(0, r.left), y0 = Math.max(0, r.top);
+        const x1 = Math.min(W, r.right), y1 = Math.min(H, r.bottom);
+        if (x1 > x0 && y1 > y0) out.push([x0, y0, x1 - x0, y1 - y0]);
+    };
+    const skip = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"]);
+    const fields = new Set(["INPUT", "TEXTAREA", "SELECT"]);
+    const media = new Set(["CANVAS", "IMG", "IFRAME", "VIDEO", "SVG", "EMBED", "OBJECT"]);
+    const range = document.createRange();
+    const walk = root => {
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+            acceptNode: n => n.nodeType === 1 && skip.has(n.tagName.toUpperCase())
+                ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+        });
+        for (let n = walker.nextNode(); n; n = walker.nextNode()) {
+            if (n.nodeType === 3) {
+                if (/\\S/.test(n.data)) {
+                    range.selectNodeContents(n);
+                    for (const r of range.getClientRects()) push(text, r);
+                }
+                continue;
+            }
+            const tag = n.tagName.toUpperCase();
+            if (fields.has(tag) && !(tag === "INPUT" && n.type === "hidden")) push(text, n.getBoundingClientRect());
+            else if (media.has(tag)) push(opaque, n.getBoundingClientRect());
+            if (n.shadowRoot) walk(n.shadowRoot);
+        }
+    };
+    walk(document.body || document.documentElement);
+    return {text, opaque, scroll: [scrollX, scrollY]};
+}
+"""
+
+def simplify_path(points: List[tuple], tolerance: float) -> List[tuple]:
+    """Ramer-Douglas-Peucker: drops points closer than `tolerance` px to the simplified line."""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        length = math.hypot(x2 - x1, y2 - y1)
+        index, dist = None, tolerance
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if length:
+                d = abs((x2 - x1) * (y1 - py) - (x1 - px) * (y2 - y1)) / length
+            else:
+                d = math.hypot(px - x1, py - y1)
+            if d > dist:
+                index, dist = i, d
+        if index is not None:
+            keep[index] = True
+            stack += [(first, index), (index, last)]
+    return [p for p, k in zip(points, keep) if k]
+
+
 class BasePlaywrightComputer:
     environment: Literal["browser"] = "browser"
-    dimensions = (1024, 768)
+    viewport_size = (1024, 768)  # page size in CSS pixels
+    # Images returned to the model cover `roi` (x, y, w, h in page CSS px; None = whole
+    # viewport) scaled by output_scale. Action coordinates are mapped back to page space.
+    output_scale = 1.0
+    roi: Optional[tuple] = None
+    # type(): "keys" sends one key event per character, "insert" inserts the whole text
+    # at once, "auto" inserts anything longer than type_insert_threshold characters.
+    type_mode: Literal["auto", "keys", "insert"] = "auto"
+    type_insert_threshold = 32
+    # drag(): simplify the path within drag_tolerance px, then one mouse move per remaining
+    # point. Set drag_step (px) for pages that need intermediate mousemove events.
+    drag_tolerance = 2.0
+    drag_step = None
 
     def __init__(self):
         self._playwright = None
         self._browser = None
         self._page = None
         self._code_buffer = []
+        self._inflight = set()
+        self._request_handlers = None  # (page, handlers) registered by _watch_requests
+        self._cdp = None  # (page, CDPSession) used for cheap settle probes
 
     async def __aenter__(self):
         # Start Playwright, then get a browser and page via the subclass method
         self._playwright = await async_playwright().start()
         self._browser, self._page = await self._get_browser_and_page()
+        self._watch_requests(self._page)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -59,6 +153,36 @@ class BasePlaywrightComputer:
         """Subclasses must override this method to return (browser, page)."""
         raise NotImplementedError
 
+    @property
+    def dimensions(self) -> tuple[int, int]:
+        """Size of the images the model sees, which is also its coordinate space."""
+        w, h = self.roi[2:] if self.roi else self.viewport_size
+        return round(w * self.output_scale), round(h * self.output_scale)
+
+    def set_output(self, scale: float = 1.0, roi: Optional[tuple] = None) -> None:
+        """Configures downscaling and region-of-interest cropping of screenshots."""
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        self.output_scale = scale
+        self.roi = tuple(roi) if roi else None
+
+    def _to_page(self, x, y) -> tuple[float, float]:
+        """Maps a point in screenshot space back to page (CSS pixel) space."""
+        rx, ry = self.roi[:2] if self.roi else (0, 0)
+        return rx + x / self.output_scale, ry + y / self.output_scale
+
+    def _from_page_rect(self, rect) -> Optional[tuple[int, int, int, int]]:
+        """Maps an (x, y, w, h) page rect into screenshot space, rounded outwards and clipped."""
+        rx, ry = self.roi[:2] if self.roi else (0, 0)
+        s = self.output_scale
+        w, h = self.dimensions
+        x0, y0 = max(0, math.floor((rect[0] - rx) * s)), max(0, math.floor((rect[1] - ry) * s))
+        x1 = min(w, math.ceil((rect[0] + rect[2] - rx) * s))
+        y1 = min(h, math.ceil((rect[1] + rect[3] - ry) * s))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
 
     async def copy_text_from_page(self) -> str:
         """Extracts all visible text from the current webpage."""
@@ -79,12 +203,147 @@ class BasePlaywrightComputer:
         return self._page.url  # Playwright's built-in property for full URLs
 
 
+    def _watch_requests(self, page: Page) -> None:
+        """Tracks in-flight requests so wait_until_stable knows when the network is quiet."""
+        def started(request):
+            if request.resource_type not in ("websocket", "eventsource"):
+                self._inflight.add(request)
+
+        def finished(request):
+            self._inflight.discard(request)
+
+        self._unwatch_requests()
+        handlers = {"request": started, "requestfinished": finished, "requestfailed": finished}
+        for event, handler in handlers.items():
+            page.on(event, handler)
+        self._request_handlers = (page, handlers)
+
+    def _unwatch_requests(self) -> None:
+        """Detaches the request listeners, e.g. before a pooled page goes to another task."""
+        if self._request_handlers:
+            page, handlers = self._request_handlers
+            for event, handler in handlers.items():
+                page.remove_listener(event, handler)
+            self._request_handlers = None
+        self._inflight.clear()
+
+    async def _cdp_capture(self, x, y, w, h, scale: float, format: str = "png", quality: int = None) -> str:
+        """Captures a viewport region at `scale` x CSS size through CDP; returns base64 data."""
+        if self._cdp is None or self._cdp[0] is not self._page:
+            self._cdp = (self._page, await self._page.context.new_cdp_session(self._page))
+        # CDP clips are in document coordinates and its scale multiplies the device pixel ratio.
+        left, top, dpr = await self._page.evaluate(
+            "() => [visualViewport.pageLeft, visualViewport.pageTop, devicePixelRatio]"
+        )
+        params = {
+            "format": format,
+            "clip": {"x": left + x, "y": top + y, "width": w, "height": h, "scale": scale / dpr},
+            "optimizeForSpeed": True,
+        }
+        if quality is not None:
+            params["quality"] = quality
+        result = await self._cdp[1].send("Page.captureScreenshot", params)
+        return result["data"]
+
+    async def _probe_frame(self):
+        """A tiny, low-quality capture of the viewport; only ever compared for equality."""
+        try:
+            w, h = self.viewport_size
+            return await self._cdp_capture(0, 0, w, h, 0.25, format="jpeg", quality=30)
+        except Exception:
+            # Not Chromium (or CDP unavailable): fall back to a regular low-quality screenshot.
+            return await self._page.screenshot(type="jpeg", quality=30, scale="css")
+
+    async def wait_until_stable(self, timeout_ms: int = 3000, interval_ms: int = 100, stable_probes: int = 2) -> bool:
+        """Waits until the page stops changing, at most timeout_ms. Returns True if it settled.
+
+        "Stable" means: the load event has fired, no request is in flight, running
+        animations have finished and `stable_probes` consecutive low-res frames match.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+
+        def remaining_ms() -> float:
+            return max(0.0, (deadline - loop.time()) * 1000)
+
+        try:
+            await self._page.wait_for_load_state("load", timeout=remaining_ms() or 1)
+            await asyncio.wait_for(
+                self._page.evaluate(WAIT_FOR_ANIMATIONS_JS, int(remaining_ms())),
+                timeout=remaining_ms() / 1000 + 0.1,
+            )
+        except Exception:
+            pass  # timed out or navigated away mid-check; the frame probes below still apply
+
+        previous, same = None, 0
+        while True:
+            frame = await self._probe_frame()
+            same = same + 1 if frame == previous else 0
+            previous = frame
+            if same >= stable_probes and not self._inflight:
+                return True
+            if remaining_ms() <= interval_ms:
+                return False
+            await asyncio.sleep(interval_ms / 1000)
+
     async def screenshot(self) -> str:
-        png_bytes = await self._page.screenshot(full_page=False)
+        png_bytes = await self.screenshot_bytes()
         return base64.b64encode(png_bytes).decode("utf-8")
 
+    async def text_rects(self) -> Dict[str, list]:
+        """Boxes of the text on screen, read from the DOM instead of the pixels.
+
+        Returns {"text": [...], "opaque": [...]} as (x, y, w, h) boxes in screenshot
+        space, plus "scroll", the page's [scrollX, scrollY] when they were measured.
+        "opaque" covers canvases, images, iframes, video and SVG, whose text (if any)
+        only OCR can find. Open shadow roots are included; closed ones are not.
+        """
+        rects = await self._page.evaluate(TEXT_RECTS_JS)
+        return {
+            **{
+                kind: [b for b in map(self._from_page_rect, rects[kind]) if b is not None]
+                for kind in ("text", "opaque")
+            },
+            "scroll": rects["scroll"],
+        }
+
+    async def scroll_position(self) -> List[float]:
+        """The page's [scrollX, scrollY] in CSS pixels."""
+        return await self._page.evaluate("() => [scrollX, scrollY]")
+
+    async def screenshot_bytes(self) -> bytes:
+        """Returns the viewport as PNG bytes, skipping the base64 round trip of screenshot().
+
+        Always in CSS pixels (HiDPI screens don't inflate it), cropped to `roi` and
+        scaled by output_scale.
+        """
+        clip = None
+        if self.roi:
+            x, y, w, h = self.roi
+            clip = {"x": x, "y": y, "width": w, "height": h}
+        if self.output_scale == 1.0:
+            return await self._page.screenshot(full_page=False, clip=clip, scale="css")
+        x, y, w, h = self.roi or (0, 0, *self.viewport_size)
+        try:
+            return base64.b64decode(await self._cdp_capture(x, y, w, h, self.output_scale))
+        except Exception:
+            # No CDP: capture at CSS size and resize here.
+            import cv2
+            import numpy as np
+            png_bytes = await self._page.screenshot(full_page=False, clip=clip, scale="css")
+            img = cv2.imdecode(np.frombuffer(png_bytes, np.uint8), cv2.IMREAD_COLOR)
+            img = cv2.resize(img, self.dimensions, interpolation=cv2.INTER_AREA)
+            return cv2.imencode(".png", img)[1].tobytes()
+
+    async def screenshot_array(self):
+        """Returns the viewport as a BGR NumPy array, decoded exactly once."""
+        import cv2
+        import numpy as np
+        png_bytes = await self.screenshot_bytes()
+        return cv2.imdecode(np.frombuffer(png_bytes, np.uint8), cv2.IMREAD_COLOR)
+
     async def click(self, x: int, y: int, button: str = "left") -> None:
-  
+        x, y = self._to_page(x, y)
         if button == "wheel":
             await self._page.mouse.click(x, y, button="middle")
         else:
@@ -109,17 +368,18 @@ class BasePlaywrightComputer:
 
 
     async def double_click(self, x: int, y: int) -> None:
-        await self._page.mouse.dblclick(x, y)
+        await self._page.mouse.dblclick(*self._to_page(x, y))
 
     async def scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> None:
+        x, y = self._to_page(x, y)
+        scroll_x, scroll_y = scroll_x / self.output_scale, scroll_y / self.output_scale
         await self._page.mouse.move(x, y)
         try:
             await self._page.mouse.wheel(delta_x=scroll_x, delta_y=scroll_y)
-            await asyncio.sleep(0.5)
         except Exception as e:
             print(f"⚠️ Mouse wheel scrolling failed: {e}. Using JavaScript fallback.")
             await self._page.evaluate(f"window.scrollBy({scroll_x}, {scroll_y})")
-            await asyncio.sleep(0.5)
+        await self.wait_until_stable(timeout_ms=500)
 
     # async def type(self, text: str) -> None:
     #     with open("code.txt", "a") as code_file:
@@ -128,16 +388,25 @@ class BasePlaywrightComputer:
     #     await self._page.keyboard.type(text)
     async def type(self, text: str) -> None:
         self._code_buffer.append(text)
-        await self._page.keyboard.type(text)
+        if self.type_mode == "keys" or (self.type_mode == "auto" and len(text) <= self.type_insert_threshold):
+            await self._page.keyboard.type(text)
+            return
+        # One insertText for the bulk; trailing newlines stay real Enter presses (e.g. to submit).
+        body = text.rstrip("\n")
+        if body:
+            await self._page.keyboard.insert_text(body)
+        for _ in range(len(text) - len(body)):
+            await self._page.keyboard.press("Enter")
 
     def get_code_buffer(self) -> str:
         return "\n".join(self._code_buffer)
 
     async def wait(self, ms: int = 1000) -> None:
-        await asyncio.sleep(ms / 1000)
+        # Treat ms as an upper bound: return as soon as the page has settled.
+        await self.wait_until_stable(timeout_ms=ms)
 
     async def move(self, x: int, y: int) -> None:
-        await self._page.mouse.move(x, y)
+        await self._page.mouse.move(*self._to_page(x, y))
 
     async def keypress(self, keys: List[str]) -> None:
         mapped_keys = [CUA_KEY_TO_PLAYWRIGHT_KEY.get(key.lower(), key) for key in keys]
@@ -182,14 +451,20 @@ class BasePlaywrightComputer:
             x, y = start[0], start[1]
         else:
             raise Exception("path[0] has unknown format, expected list, tuple, or dict")
-        await self._page.mouse.move(x, y)
-        await self._page.mouse.down()
+        points = [(x, y)]
         for pt in path[1:]:
             if isinstance(pt, dict):
-                px, py = pt['x'], pt['y']
+                points.append((pt['x'], pt['y']))
             else:
-                px, py = pt[0], pt[1]
-            await self._page.mouse.move(px, py)
+                points.append((pt[0], pt[1]))
+        points = simplify_path([self._to_page(px, py) for px, py in points], self.drag_tolerance)
+        x, y = points[0]
+        await self._page.mouse.move(x, y)
+        await self._page.mouse.down()
+        for (ax, ay), (px, py) in zip(points, points[1:]):
+            # Playwright interpolates any steps itself, in a single call.
+            steps = max(1, math.ceil(math.hypot(px - ax, py - ay) / self.drag_step)) if self.drag_step else 1
+            await self._page.mouse.move(px, py, steps=steps)
         await self._page.mouse.up()
 
     async def goto(self, url: str) -> None:
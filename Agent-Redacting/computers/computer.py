@@ -11,6 +11,12 @@ class Computer(Protocol):
 
     def screenshot(self) -> str: ...
 
+    def screenshot_bytes(self) -> bytes: ...
+
+    def text_rects(self) -> Dict[str, list]: ...
+
+    def scroll_position(self) -> List[float]: ...
+
     def click(self, x: int, y: int, button: str = "left") -> None: ...
 
     def double_click(self, x: int, y: int) -> None: ...
@@ -21,6 +27,8 @@ class Computer(Protocol):
 
     def wait(self, ms: int = 100) -> None: ... #1000
 
+    def wait_until_stable(self, timeout_ms: int = 3000) -> bool: ...
+
     def move(self, x: int, y: int) -> None: ...
 
     def keypress(self, keys: List[str]) -> None: ...
@@ -0,0 +1,22 @@
+# computers/headless_playwright.py
+from typing import Optional
+from playwright.async_api import Browser, Page
+from .base_playwright import BasePlaywrightComputer
+
+
+class HeadlessPlaywrightComputer(BasePlaywrightComputer):
+    """Launches its own headless Chromium with a fixed viewport (benchmarks, offline runs)."""
+
+    def __init__(self, start_url: Optional[str] = None, headless: bool = True):
+        super().__init__()
+        self.start_url = start_url
+        self.headless = headless
+
+    async def _get_browser_and_page(self) -> tuple[Browser, Page]:
+        width, height = self.viewport_size
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        context = await browser.new_context(viewport={"width": width, "height": height})
+        page = await context.new_page()
+        if self.start_url:
+            await page.goto(self.start_url)
+        return browser, page
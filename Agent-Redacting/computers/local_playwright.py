@@ -1,17 +1,39 @@
 # computers/local_playwright.py
 import asyncio
+from typing import Optional
 from playwright.async_api import Browser, Page
 from .base_playwright import BasePlaywrightComputer
+from .pool import BrowserContextPool
 import json
 
 class LocalPlaywrightComputer(BasePlaywrightComputer):
-    """Launches a local Chromium instance using Playwright with the Chrome channel."""
+    """Launches a local Chromium instance using Playwright with the Chrome channel.
+
+    With a BrowserContextPool, pages are borrowed from the pool's warm contexts and
+    handed back on exit (the pool replaces their context) instead of opening a new tab per run.
+    """
+
+    def __init__(self, pool: Optional[BrowserContextPool] = None):
+        super().__init__()
+        self.pool = pool
 
     async def __aenter__(self):
+        if self.pool:
+            self._page = await self.pool.acquire()
+            self._watch_requests(self._page)
+            return self
         await super().__aenter__()
         return self    
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._unwatch_requests()
+        if self.pool:
+            await self.pool.release(self._page)
+            self._page = None
+            return
+        # Close our tab; over CDP, browser.close() only disconnects and would leave it open.
+        if self._page and not self._page.is_closed():
+            await self._page.close()
         await super().__aexit__(exc_type, exc_val, exc_tb)  # Explicitly call parent's __aexit__
 
 
@@ -26,6 +48,7 @@ class LocalPlaywrightComputer(BasePlaywrightComputer):
         else:
             context = await browser.new_context()
         page = await context.new_page()  # Open a new tab in Chrome
+        await page.set_viewport_size({"width": self.viewport_size[0], "height": self.viewport_size[1]})
         return browser, page
         # # Load cookies from the file and add them to the context
         # with open("cookie_br_updates2.json", "r") as f:
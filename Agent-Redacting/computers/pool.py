@@ -0,0 +1,204 @@
+# computers/pool.py
+import asyncio
+import time
+from typing import Optional, Union
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+
+class _Slot:
+    __slots__ = ("context", "page", "idle_since", "owns_context", "popups")
+
+    def __init__(self, context: BrowserContext, page: Page, owns_context: bool = True):
+        self.context = context
+        self.page = page
+        self.idle_since = time.monotonic()
+        self.owns_context = owns_context
+        self.popups: list[Page] = []  # tabs the page opened, closed with it in a shared profile
+        if not owns_context:
+            page.on("popup", self.popups.append)
+
+
+class BrowserContextPool:
+    """Pre-warmed browser pages that are handed out one task at a time.
+
+    Attaches to Chrome over CDP (or launches headless Chromium when cdp_url is None),
+    keeps `size` pages warm with a fixed viewport, reconnects when the browser goes
+    away, health-checks idle pages and evicts surplus pages idle for idle_timeout s.
+
+    By default each page lives in its own fresh context, optionally seeded with
+    `storage_state` (a path or dict from context.storage_state(), e.g. a logged-in
+    session), and the whole context is thrown away when the task releases it, so no
+    cookies, storage, IndexedDB, caches, service workers or permissions carry over.
+    With `share_profile=True` pages are instead tabs in the browser's default
+    context (the Chrome profile LocalPlaywrightComputer uses, logins included);
+    tasks then share that profile's state and only their tabs are closed on release.
+    """
+
+    def __init__(
+        self,
+        cdp_url: Optional[str] = "http://localhost:9222",
+        size: int = 4,
+        viewport: tuple[int, int] = (1024, 768),
+        idle_timeout: float = 300.0,
+        health_interval: float = 30.0,
+        headless: bool = True,
+        storage_state: Optional[Union[str, dict]] = None,
+        share_profile: bool = False,
+    ):
+        if share_profile and storage_state is not None:
+            raise ValueError("storage_state only applies to isolated contexts (share_profile=False)")
+        self.cdp_url = cdp_url
+        self.size = size
+        self.viewport = viewport
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.headless = headless
+        self.storage_state = storage_state
+        self.share_profile = share_profile
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._idle: list[_Slot] = []
+        self._busy: dict[Page, _Slot] = {}
+        self._lock = asyncio.Lock()
+        self._maintenance: Optional[asyncio.Task] = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self) -> None:
+        self._playwright = await async_playwright().start()
+        async with self._lock:
+            await self._ensure_connected()
+        await self._warm()
+        self._maintenance = asyncio.create_task(self._maintain())
+
+    async def close(self) -> None:
+        if self._maintenance:
+            self._maintenance.cancel()
+        for slot in self._idle + list(self._busy.values()):
+            await self._discard(slot)
+        self._idle, self._busy = [], {}
+        if self._browser and self._browser.is_connected():
+            await self._browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+
+    async def _ensure_connected(self, attempts: int = 5) -> None:
+        if self._browser and self._browser.is_connected():
+            return
+        # Anything opened on the old connection is gone with it.
+        self._idle = []
+        self._busy = {}
+        for attempt in range(attempts):
+            try:
+                if self.cdp_url:
+                    self._browser = await self._playwright.chromium.connect_over_cdp(self.cdp_url)
+                else:
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                return
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"⚠️ Browser connection failed ({e}); retrying...")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _new_slot(self) -> _Slot:
+        width, height = self.viewport
+        if self.share_profile:
+            context = self._browser.contexts[0] if self._browser.contexts else await self._browser.new_context()
+            page = await context.new_page()
+            await page.set_viewport_size({"width": width, "height": height})
+            return _Slot(context, page, owns_context=False)
+        context = await self._browser.new_context(
+            viewport={"width": width, "height": height}, storage_state=self.storage_state
+        )
+        return _Slot(context, await context.new_page())
+
+    async def _warm(self) -> None:
+        """Opens pages (outside the lock) until the pool is back to `size`."""
+        async with self._lock:
+            missing = self.size - len(self._idle) - len(self._busy)
+        fresh = []
+        for _ in range(max(0, missing)):
+            try:
+                fresh.append(await self._new_slot())
+            except Exception as e:
+                print(f"⚠️ Browser pool could not open a page: {e}")
+                break
+        async with self._lock:
+            self._idle.extend(fresh)
+
+    async def _discard(self, slot: _Slot) -> None:
+        try:
+            if slot.owns_context:
+                await slot.context.close()
+            else:
+                for page in slot.popups + [slot.page]:
+                    if not page.is_closed():
+                        await page.close()
+        except Exception:
+            pass
+
+    async def _healthy(self, slot: _Slot) -> bool:
+        try:
+            return not slot.page.is_closed() and await asyncio.wait_for(slot.page.evaluate("1"), 5) == 1
+        except Exception:
+            return False
+
+    async def acquire(self) -> Page:
+        """Hands out a ready page, creating one if none is idle."""
+        while True:
+            async with self._lock:
+                await self._ensure_connected()
+                slot = self._idle.pop() if self._idle else None
+            if slot is None:
+                slot = await self._new_slot()
+                break
+            if await self._healthy(slot):
+                break
+            await self._discard(slot)
+        async with self._lock:
+            self._busy[slot.page] = slot
+        return slot.page
+
+    async def release(self, page: Page) -> None:
+        """Throws away the page's context (or, in a shared profile, its tabs) and refills the pool."""
+        async with self._lock:
+            slot = self._busy.pop(page, None)
+        if slot is None:
+            return
+        await self._discard(slot)
+        await self._warm()
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            async with self._lock:
+                try:
+                    await self._ensure_connected()
+                except Exception as e:
+                    print(f"⚠️ Browser pool could not reconnect: {e}")
+                    continue
+                # Take the idle pages out while they are probed, so acquire() neither
+                # waits on the probes nor hands out a page that is about to be dropped.
+                idle, self._idle = self._idle, []
+                busy = len(self._busy)
+            now = time.monotonic()
+            keep, drop = [], []
+            # Oldest first, so the freshest pages are the ones kept warm.
+            idle.sort(key=lambda s: s.idle_since)
+            for i, slot in enumerate(idle):
+                surplus = len(keep) + (len(idle) - i) + busy > self.size
+                if (surplus and now - slot.idle_since > self.idle_timeout) or not await self._healthy(slot):
+                    drop.append(slot)
+                else:
+                    keep.append(slot)
+            async with self._lock:
+                self._idle.extend(keep)
+            for slot in drop:
+                await self._discard(slot)
+            await self._warm()
@@ -0,0 +1,94 @@
+#journal.py
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+_CLOSE = object()
+
+
+class SessionJournal:
+    """Append-only JSONL record of a session.
+
+    append() and checkpoint() only enqueue; a background thread writes whatever is
+    queued in one batch and flushes, so logging never waits on the disk. Only the
+    last `tail_size` events stay in memory (in `tail`).
+    """
+
+    def __init__(self, path: str, tail_size: int = 200):
+        self.path = path
+        self.tail = deque(maxlen=tail_size)
+        self._queue = queue.Queue()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def append(self, event) -> None:
+        """Records one event (any JSON-serialisable value)."""
+        self.tail.append(event)
+        self._queue.put({"ts": time.time(), "kind": "event", "data": event})
+
+    def checkpoint(self, **state) -> None:
+        """Records the state needed to resume (e.g. previous_response_id)."""
+        self._queue.put({"ts": time.time(), "kind": "checkpoint", "state": state})
+
+    def flush(self) -> None:
+        """Blocks until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _writer(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                closing = False
+                for record in batch:
+                    if record is _CLOSE:
+                        closing = True
+                    else:
+                        f.write(json.dumps(record, default=str) + "\n")
+                f.flush()
+                for _ in batch:
+                    self._queue.task_done()
+                if closing:
+                    return
+
+
+def load_last_checkpoint(path: str, block_size: int = 64 * 1024) -> Optional[dict]:
+    """Returns the state of the last checkpoint in a journal, reading backwards from the end."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        partial = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b"\n")
+            # The first piece may be the end of a longer line; finish it on the next block.
+            partial = lines[0] if pos > 0 else b""
+            for line in reversed(lines[1:] if pos > 0 else lines):
+                if b'"checkpoint"' not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("kind") == "checkpoint":
+                    return record["state"]
+    return None
@@ -1,75 +1,135 @@
 import time
-import base64
-import nest_asyncio
 import asyncio
-import json
 import os
-from openai import OpenAI
 from computers import LocalPlaywrightComputer
-from agent.agent import Agent
+from client import ResponsesClient
+from journal import SessionJournal, load_last_checkpoint
+from tracing import export as export_trace, instrument_computer, tracer
 import re
 from pathlib import Path
-import cv2
-import numpy as np
-import pytesseract
-nest_asyncio.apply()
-conversation_data = []
-previous_response_id = None
+# Importing this module has no side effects and doesn't load cv2/numpy/OCR (runner.py and
+# the OCR pool workers import it); they load on the first capture. See benchmarks/bench_import.py.
+from redaction import (
+    DEFAULT_RULES, DomRedactor, FrameEncoder, IncrementalRedactor, fill_boxes, get_backend,
+)
+journal = None  # SessionJournal for the running session, opened in main()
+JOURNAL_FILE = "saved_conv/journal.jsonl"  # every event is appended here as it happens
 RESUME = False
-RESUME_FILE = "saved_conv/high1.json"  # disabled
+RESUME_FILE = JOURNAL_FILE  # resume from the last checkpoint written to this journal
+# "ocr" finds text in the pixels; "dom" reads text boxes from the page and only OCRs
+# canvases/images/iframes. Frames where the page scrolled between the screenshot and
+# the DOM query fall back to OCR. Still misses CSS ::before/::after text, background
+# images, closed shadow roots, and CSS animations/transitions that move text between
+# the two calls without scrolling.
+REDACTION_MODE = "ocr"
+INCREMENTAL_REDACTION = True  # only re-OCR the tiles that changed since the last screenshot
+# "tesserocr" (in-process engine), "pytesseract" (CLI per call) or "auto";
+# "morph" / "db" only locate text regions without recognising them (much faster)
+OCR_BACKEND = "auto"
+OCR_WORKERS = None  # processes in the OCR pool; None uses every core, 0 runs OCR in a thread here
+# Image sent back in computer_call_output: png (lossless), or jpeg/webp with a quality for smaller uploads
+OUTPUT_ENCODER = FrameEncoder(format="png", png_compression=1)
+# Downscale (e.g. 0.75) and/or crop (x, y, w, h in page px) the frames the model sees;
+# the computer maps its click/scroll/drag/move coordinates back to the page.
+OUTPUT_SCALE = 1.0
+OUTPUT_ROI = None
+SAVE_REDACTED = True  # keep a copy of the last redacted frame on disk
+BATCH_ACTIONS = True  # run every computer_call in a response, then capture and redact one screenshot
+TRACE_FILE = None  # e.g. "trace.json": record per-step spans (open in ui.perfetto.dev); AGENT_TRACE=1 also turns them on
+RECORD_FRAMES_DIR = None  # set to a folder to keep the raw screenshots for benchmarks/bench_ocr.py
+redactor = IncrementalRedactor()
+# Every colour rule is evaluated in the same pass (see redaction/rules.py for the palette).
+REDACTION_RULES = DEFAULT_RULES
 
 def acknowledge_safety_check_callback(message: str) -> bool:
     safe_append_log(f"Auto-acknowledging safety check: {message}")
     return True
 
 def safe_append_log(message):
-    global conversation_data
     print(message)
-    conversation_data.append(message)
-
-
-async def capture_and_display(computer, step_name):
-    s = await computer.screenshot()
-    img_bytes = base64.b64decode(s)
-    nparr = np.frombuffer(img_bytes, np.uint8)
-    img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-    # Detect and redact code box
-    TARGET_COLOR = np.array([59, 51, 45], dtype=np.uint8)
-    TOLERANCE = 2
-    lower = TARGET_COLOR - TOLERANCE
-    upper = TARGET_COLOR + TOLERANCE
-    mask = cv2.inRange(img, lower, upper)
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if contours:
-        largest = max(contours, key=cv2.contourArea)
-        x, y, box_w, box_h = cv2.boundingRect(largest)
-        cv2.rectangle(img, (x, y), (x+box_w, y+box_h),
-                      (int(TARGET_COLOR[0]), int(TARGET_COLOR[1]), int(TARGET_COLOR[2])), thickness=-1)
+    if journal:
+        journal.append(message)
+
+
+class SessionState:
+    """Everything one conversation owns: response chain, journal, redaction cache, step counter.
+
+    main() keeps a single one; runner.py creates one per concurrent session.
+    """
+
+    def __init__(self, journal=None, previous_response_id=None, name=None, redactor=None):
+        self.journal = journal
+        self.previous_response_id = previous_response_id
+        self.name = name
+        self.redactor = redactor or IncrementalRedactor()
+        self.step = 0
+
+    def log(self, message):
+        print(f"[{self.name}] {message}" if self.name else message)
+        if self.journal:
+            self.journal.append(message)
+
+
+async def capture_and_display(computer, step_name, session_redactor=None, save_redacted=None):
+    """Screenshots and redacts the page; returns the encoded frame as a data URL."""
+    import cv2
+    import numpy as np
+    session_redactor = session_redactor or redactor
+    save_redacted = SAVE_REDACTED if save_redacted is None else save_redacted
+    scroll = None
+    if REDACTION_MODE == "dom":
+        try:
+            scroll = await computer.scroll_position()
+        except Exception as e:  # navigating, or not a browser: OCR this frame
+            safe_append_log(f"⚠️ DOM text query failed, falling back to OCR: {e}")
+    with tracer.span("capture.screenshot", step_name=step_name):
+        img_bytes = await computer.screenshot_bytes()
+    dom_rects = None
+    if scroll is not None:
+        with tracer.span("capture.dom_rects"):
+            try:
+                dom_rects = await computer.text_rects()
+            except Exception as e:  # navigated mid-query: OCR this frame
+                safe_append_log(f"⚠️ DOM text query failed, falling back to OCR: {e}")
+        # The boxes only line up with the screenshot if the page didn't scroll in between.
+        if dom_rects is not None and dom_rects["scroll"] != scroll:
+            safe_append_log("⚠️ Page scrolled during capture, falling back to OCR")
+            dom_rects = None
+    with tracer.span("capture.decode"):
+        nparr = np.frombuffer(img_bytes, np.uint8)
+        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if RECORD_FRAMES_DIR:
+        os.makedirs(RECORD_FRAMES_DIR, exist_ok=True)
+        with open(os.path.join(RECORD_FRAMES_DIR, f"{time.time_ns()}_{step_name}.png"), "wb") as f:
+            f.write(img_bytes)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # Detect and redact code boxes
+    with tracer.span("capture.colour_mask"):
+        REDACTION_RULES.apply_colors(img)
 
     # Redact white regions based on OCR
     img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-    data = pytesseract.image_to_data(img_rgb, output_type=pytesseract.Output.DICT)
-    n_boxes = len(data['level'])
-    for i in range(n_boxes):
-        (x, y, w, h) = (data['left'][i], data['top'][i], data['width'][i], data['height'][i])
-        if data['text'][i].strip() != "":
-            cv2.rectangle(img, (x, y), (x + w, y + h), (255, 255, 255), thickness=-1)
-
-    # Draw two horizontal white lines to mask possible leaked text at the bottom area
-    h, w, _ = img.shape
-    rect_y1 = int(h * 0.75)
-    line_thickness = 5
-    cv2.line(img, (0, rect_y1), (w, rect_y1), (255, 255, 255), thickness=line_thickness)
-    rect_y2 = rect_y1 - line_thickness * 2
-    cv2.line(img, (0, rect_y2), (w, rect_y2), (255, 255, 255), thickness=line_thickness)
-
-    retval, buf = cv2.imencode('.png', img)
-    redacted_base64 = base64.b64encode(buf).decode('utf-8')
-    cv2.imwrite('redacted.png', img)
-    return redacted_base64
-
-def get_pending_safety_checks(response):
+    if not INCREMENTAL_REDACTION:
+        session_redactor.reset()
+    if dom_rects is not None:
+        with tracer.span("capture.dom_boxes", opaque=len(dom_rects["opaque"])):
+            boxes = await DomRedactor(ocr=session_redactor.ocr).text_boxes(dom_rects, img_rgb)
+    else:
+        with tracer.span("capture.ocr"):
+            boxes = await session_redactor.text_boxes(gray, img_rgb)
+    with tracer.span("capture.box_fill", boxes=len(boxes)):
+        fill_boxes(img, boxes)
+        REDACTION_RULES.apply_bands(img)
+
+    with tracer.span("capture.encode"):
+        encoded = OUTPUT_ENCODER.encode(img)
+    if save_redacted:
+        with open("redacted." + OUTPUT_ENCODER.extension, "wb") as f:
+            f.write(encoded)
+    return OUTPUT_ENCODER.data_url(encoded)
+
+def get_pending_safety_checks(response, call_id=None):
     output = getattr(response, "output", None) if not isinstance(response, dict) else response.get("output", [])
     if output is None:
         output = []
@@ -77,6 +137,8 @@ def get_pending_safety_checks(response):
     for o in output:
         o_type = o["type"] if isinstance(o, dict) else getattr(o, "type", None)
         if o_type == "computer_call":
+            if call_id is not None and (o.get("call_id") if isinstance(o, dict) else getattr(o, "call_id", None)) != call_id:
+                continue
             for field in ["pending_safety_check", "pending_safety_checks"]:
                 pending = o.get(field, None) if isinstance(o, dict) else getattr(o, field, None)
                 if pending:
@@ -86,7 +148,8 @@ def get_pending_safety_checks(response):
                         pending_checks.append(pending)
     return pending_checks
 
-async def process_single_action(agent, response, computer):
+async def process_single_action(agent, response, computer, state=None):
+    log = state.log if state else safe_append_log
     l = None
     b = None
     output = getattr(response, "output", None) if not isinstance(response, dict) else response.get("output", [])
@@ -101,18 +164,63 @@ async def process_single_action(agent, response, computer):
                 text = c0["text"] if isinstance(c0, dict) else getattr(c0, "text", "")
             else:
                 text = ""
-            safe_append_log("🤖 OpenAI says: " + text)
+            log("🤖 OpenAI says: " + text)
         if o_type == "computer_call":
             l = o.get("call_id") if isinstance(o, dict) else getattr(o, "call_id", None)
             action = o.get("action") if isinstance(o, dict) else getattr(o, "action", {})
-            safe_append_log("📩 Processing action: " + str(action))
+            log("📩 Processing action: " + str(action))
             act_type = action.get("type") if isinstance(action, dict) else getattr(action, "type", None)
             act_args = {k: v for k, v in (action.items() if isinstance(action, dict) else vars(action).items()) if k != "type"}
-            await getattr(computer, act_type)(**act_args)
-            b = await capture_and_display(computer, "action_" + str(act_type))
+            with tracer.span("process_single_action", action=act_type, call_id=l):
+                await getattr(computer, act_type)(**act_args)
+                b = await capture_and_display(
+                    computer, "action_" + str(act_type),
+                    session_redactor=state.redactor if state else None,
+                    save_redacted=None if state is None or state.name is None else False,
+                )
             break
     return l, b
 
+async def process_actions(agent, response, computer, state=None):
+    """Runs every computer_call in the response in order, then captures one redacted screenshot.
+
+    Returns the call ids and the data URL that serves as the output of all of them.
+    """
+    log = state.log if state else safe_append_log
+    call_ids = []
+    act_type = None
+    output = getattr(response, "output", None) if not isinstance(response, dict) else response.get("output", [])
+    if output is None:
+        output = []
+    with tracer.span("process_actions"):
+        for o in output:
+            o_type = o["type"] if isinstance(o, dict) else getattr(o, "type", None)
+            if o_type == "message":
+                content = o.get("content", [{}]) if isinstance(o, dict) else getattr(o, "content", [])
+                if content and len(content) > 0:
+                    c0 = content[0]
+                    text = c0["text"] if isinstance(c0, dict) else getattr(c0, "text", "")
+                else:
+                    text = ""
+                log("🤖 OpenAI says: " + text)
+            if o_type == "computer_call":
+                l = o.get("call_id") if isinstance(o, dict) else getattr(o, "call_id", None)
+                action = o.get("action") if isinstance(o, dict) else getattr(o, "action", {})
+                log("📩 Processing action: " + str(action))
+                act_type = action.get("type") if isinstance(action, dict) else getattr(action, "type", None)
+                act_args = {k: v for k, v in (action.items() if isinstance(action, dict) else vars(action).items()) if k != "type"}
+                with tracer.span("process_actions.action", action=act_type, call_id=l):
+                    await getattr(computer, act_type)(**act_args)
+                call_ids.append(l)
+        if not call_ids:
+            return [], None
+        b = await capture_and_display(
+            computer, "action_" + str(act_type),
+            session_redactor=state.redactor if state else None,
+            save_redacted=None if state is None or state.name is None else False,
+        )
+    return call_ids, b
+
 def response_contains_keywords(r, k=None):
     if k is None:
         k = ["would you like", "proceed", "confirm", "are you sure", "should i", "do you"]
@@ -132,115 +240,148 @@ def response_contains_keywords(r, k=None):
                 return True
     return False
 
-if RESUME:
-    with open(RESUME_FILE, "r") as f:
-        saved = json.load(f)
-    previous_response_id = saved["previous_response_id"]
-    conversation_data = saved["conversation"]
+def computer_tools(computer):
+    return [{
+        "type": "computer_use_preview",
+        "display_width": computer.dimensions[0],
+        "display_height": computer.dimensions[1],
+        "environment": computer.environment,
+    }]
 
-async def main():
-    global previous_response_id
+async def create_in_session(client, computer, state, input_items):
+    """Creates the next response on the session's chain and records it."""
+    r = await client.create(
+        model="computer-use-preview",
+        previous_response_id=state.previous_response_id,
+        truncation="auto",
+        tools=computer_tools(computer),
+        input=input_items
+    )
+    state.previous_response_id = r["id"]
+    state.step += 1
+    tracer.set_context(step=state.step, response_id=r["id"])
+    if state.journal:
+        state.journal.append({"role": "assistant", "content": r})
+        state.journal.checkpoint(previous_response_id=state.previous_response_id)
+    return r
+
+async def run_turn(client, computer, text, state):
+    """Sends one user message and executes actions until the model stops calling the computer.
+
+    Returns True when the model asked for confirmation and should be answered with "yes".
+    """
+    if state.journal:
+        state.journal.append({"role": "user", "content": text})
+    state.log("Creating response for user input...")
+    r = await create_in_session(client, computer, state, [{
+        "role": "user",
+        "content": [{
+            "type": "input_text",
+            "text": text
+        }]
+    }])
+    state.log("🆔 Agent response ID: " + r["id"])
+    x = False
+    if response_contains_keywords(r):
+        state.log("🔍 Trigger keyword detected. Will auto-respond with 'yes' next round.")
+        x = True
+    while True:
+        if BATCH_ACTIONS:
+            call_ids, b = await process_actions(None, r, computer, state)
+        else:
+            l, b = await process_single_action(None, r, computer, state)
+            call_ids = [l] if l else []
+        pending_checks = get_pending_safety_checks(r)
+        acknowledged_checks = []
+        if pending_checks:
+            state.log("Safety checks received during action processing. Auto-acknowledging...")
+            for check in pending_checks:
+                message = check.get("message", "No message provided") if isinstance(check, dict) else getattr(check, "message", "No message provided")
+                if acknowledge_safety_check_callback(message):
+                    acknowledged_checks.append(check)
+            if not acknowledged_checks:
+                state.log("No safety checks acknowledged. Continuing without safety check approval.")
+        if not call_ids:
+            return x
+        input_items = []
+        for l in call_ids:
+            input_data = {"call_id": l, "type": "computer_call_output", "output": {"type": "input_image", "image_url": b}}
+            # Batched outputs each acknowledge only their own call's checks.
+            checks = [c for c in get_pending_safety_checks(r, l) if c in acknowledged_checks] if BATCH_ACTIONS else acknowledged_checks
+            if checks:
+                input_data["acknowledged_safety_checks"] = checks
+            input_items.append(input_data)
+        r = await create_in_session(client, computer, state, input_items)
+        if response_contains_keywords(r):
+            state.log("🔍 Trigger keyword detected in action response. Will auto-respond with 'yes' next round.")
+            x = True
+
+def read_api_key():
     with open("api_key.txt", "r") as f:
-        api_key = f.readline().strip()
-    c = OpenAI(api_key=api_key)
-    async with LocalPlaywrightComputer() as comp:
-        safe_append_log("🚀 Browser initialized. Navigating to DuckDuckGo...")
-        # target = "https://www.bing.com/"
-        target = "https://feather.openai.com/tasks/db3e371b-deb2-4c64-b0e1-048bd1226527#"
+        return f.readline().strip()
+
+async def main():
+    global journal
+    previous_response_id = None
+    if RESUME:
+        saved = load_last_checkpoint(RESUME_FILE)
+        if saved:
+            previous_response_id = saved["previous_response_id"]
+    journal = SessionJournal(JOURNAL_FILE)
+    c = ocr_pool = None
+    try:
+        state = SessionState(journal=journal, previous_response_id=previous_response_id, redactor=redactor)
+        c = ResponsesClient(
+            api_key=read_api_key(),
+            on_retry=lambda n, e, delay: safe_append_log(f"Error during create: {e}. Retry {n} in {delay:.1f}s..."),
+        )
+        from redaction import OcrPool
+        ocr_pool = OcrPool(workers=OCR_WORKERS, backend=OCR_BACKEND) if OCR_WORKERS != 0 else None
+        redactor.ocr = ocr_pool.word_boxes if ocr_pool else get_backend(OCR_BACKEND).word_boxes
+        tracer.enabled = tracer.enabled or TRACE_FILE is not None
+        async with LocalPlaywrightComputer() as comp:
+            instrument_computer(comp)
+            comp.set_output(OUTPUT_SCALE, OUTPUT_ROI)
+            safe_append_log("🚀 Browser initialized. Navigating to DuckDuckGo...")
+            # target = "https://www.bing.com/"
+            target = "https://feather.openai.com/tasks/db3e371b-deb2-4c64-b0e1-048bd1226527#"
     
-        if re.match(r'^https?://', target):
-            await comp.goto(target)
-        else:
-            await comp.goto(Path(target).absolute().as_uri())
-        await capture_and_display(comp, "initial_page")
-        a = Agent(computer=comp)
-        safe_append_log("🤖 Agent is ready. (Type 'exit' or 'save' anytime.)")
-        x = False
-        while True:
-            if x:
-                u = "yes"
-                safe_append_log("💬 Auto-responding with: yes")
-                x = False
-                time.sleep(3)
+            if re.match(r'^https?://', target):
+                await comp.goto(target)
             else:
-                u = input("You: ")
-                if u.lower() == "exit":
-                    safe_append_log("👋 Conversation ended by user.")
-                    break
-                if u.lower() == "save":
-                    safe_append_log("💾 Saving conversation...")
-                    if not os.path.exists("saved_conv"):
-                        os.makedirs("saved_conv")
-                    with open("saved_conv/"+(previous_response_id if previous_response_id else "no_resp_id")+".json", "w") as f:
-                        json.dump({"previous_response_id": previous_response_id, "conversation": conversation_data}, f)
-                    continue
-                conversation_data.append({"role": "user", "content": u})
-            for n in range(3):
-                try:
-                    safe_append_log("Attempt " + str(n+1) + ": Creating response for user input...")
-                    r = c.responses.create(
-                        model="computer-use-preview",
-                        previous_response_id=previous_response_id,
-                        truncation="auto",
-                        tools=[{"type": "computer_use_preview", "display_width": 1024, "display_height": 768, "environment": "browser"}],
-                        input=[{
-                            "role": "user",
-                            "content": [{
-                                "type": "input_text",
-                                "text": u
-                            }]
-                        }]
-                    )
-                    break
-                except Exception as e:
-                    safe_append_log("Error during create: " + str(e))
-                    if n == 2:
-                        raise
-                    else:
-                        safe_append_log("Retrying...")
-            previous_response_id = r.id
-            conversation_data.append({"role": "assistant", "content": r.model_dump()})
-            safe_append_log("🆔 Agent response ID: " + r.id)
-            if response_contains_keywords(r):
-                safe_append_log("🔍 Trigger keyword detected. Will auto-respond with 'yes' next round.")
-                x = True
+                await comp.goto(Path(target).absolute().as_uri())
+            await capture_and_display(comp, "initial_page")
+            safe_append_log("🤖 Agent is ready. (Type 'exit' or 'save' anytime.)")
+            x = False
             while True:
-                l, b = await process_single_action(a, r, comp)
-                pending_checks = get_pending_safety_checks(r)
-                acknowledged_checks = []
-                if pending_checks:
-                    safe_append_log("Safety checks received during action processing. Auto-acknowledging...")
-                    for check in pending_checks:
-                        message = check.get("message", "No message provided") if isinstance(check, dict) else getattr(check, "message", "No message provided")
-                        if acknowledge_safety_check_callback(message):
-                            acknowledged_checks.append(check)
-                    if not acknowledged_checks:
-                        safe_append_log("No safety checks acknowledged. Continuing without safety check approval.")
-                if not l:
-                    break
-                for z in range(3):
-                    try:
-                        input_data = {"call_id": l, "type": "computer_call_output", "output": {"type": "input_image", "image_url": "data:image/png;base64," + b}}
-                        if acknowledged_checks:
-                            input_data["acknowledged_safety_checks"] = acknowledged_checks
-                        r = c.responses.create(
-                            model="computer-use-preview",
-                            previous_response_id=r.id,
-                            truncation="auto",
-                            tools=[{"type": "computer_use_preview", "display_width": 1024, "display_height": 768, "environment": "browser"}],
-                            input=[input_data]
-                        )
+                if x:
+                    u = "yes"
+                    safe_append_log("💬 Auto-responding with: yes")
+                    x = False
+                    await comp.wait_until_stable(timeout_ms=3000)
+                else:
+                    u = input("You: ")
+                    if u.lower() == "exit":
+                        safe_append_log("👋 Conversation ended by user.")
                         break
-                    except Exception as e:
-                        safe_append_log("Error during create: " + str(e))
-                        if z == 2:
-                            raise
-                        else:
-                            safe_append_log("Retrying...")
-                previous_response_id = r.id
-                conversation_data.append({"role": "assistant", "content": r.model_dump()})
-                if response_contains_keywords(r):
-                    safe_append_log("🔍 Trigger keyword detected in action response. Will auto-respond with 'yes' next round.")
-                    x = True
-
-asyncio.run(main())
\ No newline at end of file
+                    if u.lower() == "save":
+                        safe_append_log("💾 Saving conversation...")
+                        journal.checkpoint(previous_response_id=state.previous_response_id)
+                        journal.flush()
+                        continue
+                x = await run_turn(c, comp, u, state)
+    finally:
+        # Also on errors: the journal's writer is a daemon thread, so anything still
+        # queued (like the checkpoint RESUME reads) is lost unless it's closed.
+        journal.close()
+        if c:
+            await c.aclose()
+        export_trace(TRACE_FILE, safe_append_log)
+        if ocr_pool:
+            ocr_pool.close()
+
+if __name__ == "__main__":
+    # Guarded so the OCR pool's worker processes can import this module safely.
+    import nest_asyncio
+    nest_asyncio.apply()
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,27 @@
+# Names are resolved on first access, so `import redaction` (or importing a name from one
+# submodule) doesn't load cv2/numpy/the process pool until something actually uses them.
+import importlib
+
+_EXPORTS = {
+    "ocr": ["OcrBackend", "PytesseractBackend", "TesserocrBackend", "get_backend", "word_boxes", "fill_boxes"],
+    "detect": ["MorphTextDetector", "DnnTextDetector"],
+    "rules": ["ColorRule", "BandRule", "RedactionRules", "DEFAULT_RULES"],
+    "encoding": ["FrameEncoder"],
+    "incremental": ["IncrementalRedactor"],
+    "dom": ["DomRedactor"],
+    "pool": ["OcrPool", "split_tiles"],
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    if name not in _MODULE_OF:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + _MODULE_OF[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
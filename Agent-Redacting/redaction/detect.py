@@ -0,0 +1,95 @@
+#redaction/detect.py
+import os
+from typing import List, Optional
+import cv2
+import numpy as np
+from .ocr import BACKENDS, Box
+
+
+class MorphTextDetector:
+    """Finds text lines with a morphological pipeline; no character recognition at all.
+
+    Gradient -> Otsu threshold -> horizontal closing joins glyphs into words/lines,
+    then contours that are too thin, too tall or too sparse to be text are dropped.
+    Works for dark-on-light and light-on-dark text alike.
+    """
+
+    name = "morph"
+
+    def __init__(
+        self,
+        join_width: int = 9,
+        min_height: int = 6,
+        max_height: int = 60,
+        min_width: int = 4,
+        min_fill: float = 0.45,
+    ):
+        self.gradient_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self.join_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (join_width, 1))
+        self.min_height = min_height
+        self.max_height = max_height
+        self.min_width = min_width
+        self.min_fill = min_fill
+
+    def word_boxes(self, img_rgb: np.ndarray) -> List[Box]:
+        gray = img_rgb if img_rgb.ndim == 2 else cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
+        grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, self.gradient_kernel)
+        _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        joined = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, self.join_kernel)
+        contours, _ = cv2.findContours(joined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for c in contours:
+            x, y, w, h = cv2.boundingRect(c)
+            if h < self.min_height or h > self.max_height or w < self.min_width:
+                continue
+            if cv2.countNonZero(bw[y:y + h, x:x + w]) / float(w * h) < self.min_fill:
+                continue
+            boxes.append((x, y, w, h))
+        return boxes
+
+
+class DnnTextDetector:
+    """Runs an OpenCV DNN text detector (DB by default) and returns its boxes without recognition.
+
+    Needs a model file, e.g. DB_TD500_resnet18.onnx from the OpenCV model zoo; the path
+    comes from `model_path` or the TEXT_DETECTOR_MODEL environment variable.
+    `input_size` is the largest (w, h) fed to the network; smaller inputs run at their own size.
+    """
+
+    name = "db"
+
+    def __init__(self, model_path: Optional[str] = None, input_size=(1024, 768)):
+        model_path = model_path or os.getenv("TEXT_DETECTOR_MODEL", "models/DB_TD500_resnet18.onnx")
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Text detection model not found: {model_path}")
+        self._model = cv2.dnn_TextDetectionModel_DB(model_path)
+        self._model.setBinaryThreshold(0.3).setPolygonThreshold(0.5)
+        self._model.setMaxCandidates(500).setUnclipRatio(2.0)
+        self._model.setInputParams(1.0 / 255.0, input_size, (122.67891434, 116.66876762, 104.00698793))
+        self.input_size = input_size
+
+    def word_boxes(self, img_rgb: np.ndarray) -> List[Box]:
+        img = img_rgb if img_rgb.ndim == 3 else cv2.cvtColor(img_rgb, cv2.COLOR_GRAY2RGB)
+        h, w = img.shape[:2]
+        # Shrink (never stretch) to fit input_size, keeping the aspect ratio, then pad the
+        # right/bottom edges up to the multiples of 32 the network wants. Tiles and dirty
+        # regions keep their own shape instead of being squashed into 1024x768.
+        max_w, max_h = self.input_size
+        scale = min(1.0, max_w / w, max_h / h)
+        sw, sh = max(1, round(w * scale)), max(1, round(h * scale))
+        resized = cv2.resize(img, (sw, sh), interpolation=cv2.INTER_AREA) if scale != 1.0 else img
+        in_w, in_h = -(-sw // 32) * 32, -(-sh // 32) * 32
+        padded = cv2.copyMakeBorder(resized, 0, in_h - sh, 0, in_w - sw, cv2.BORDER_REPLICATE)
+        self._model.setInputSize(in_w, in_h)
+        polygons, _ = self._model.detect(cv2.cvtColor(padded, cv2.COLOR_RGB2BGR))
+        boxes = []
+        for poly in polygons:
+            x, y, bw, bh = cv2.boundingRect(np.asarray(poly, dtype=np.float32))
+            x0, y0 = max(0, int(x / scale)), max(0, int(y / scale))
+            x1, y1 = min(w, int(np.ceil((x + bw) / scale))), min(h, int(np.ceil((y + bh) / scale)))
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1 - x0, y1 - y0))
+        return boxes
+
+BACKENDS["morph"] = MorphTextDetector
+BACKENDS["db"] = DnnTextDetector
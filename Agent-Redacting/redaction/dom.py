@@ -0,0 +1,44 @@
+#redaction/dom.py
+from __future__ import annotations
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Callable, Dict, List
+from .ocr import Box, word_boxes
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class DomRedactor:
+    """Takes text boxes from the page's DOM and only OCRs what the DOM can't describe.
+
+    `rects` comes from BasePlaywrightComputer.text_rects(): "text" boxes are used as
+    they are, and each "opaque" region (canvas, img, iframe, ...) is cropped out of
+    the frame and OCR'd on its own. Pages with no such elements never touch OCR.
+
+    `ocr` may be a plain function (run in a worker thread) or a coroutine function
+    such as OcrPool.word_boxes.
+    """
+
+    def __init__(self, ocr: Callable = word_boxes, min_region: int = 8):
+        self.ocr = ocr
+        self.min_region = min_region  # skip opaque regions thinner than this (icons, rules)
+
+    async def _run_ocr(self, img: np.ndarray) -> List[Box]:
+        if inspect.iscoroutinefunction(self.ocr):
+            return await self.ocr(img)
+        return await asyncio.to_thread(self.ocr, img)
+
+    async def text_boxes(self, rects: Dict[str, list], ocr_input: np.ndarray) -> List[Box]:
+        boxes = [tuple(b) for b in rects.get("text", [])]
+        regions = [
+            (x, y, w, h) for x, y, w, h in rects.get("opaque", [])
+            if w >= self.min_region and h >= self.min_region
+        ]
+        results = await asyncio.gather(*[
+            self._run_ocr(ocr_input[y:y + h, x:x + w]) for x, y, w, h in regions
+        ])
+        for (x0, y0, _, _), region_boxes in zip(regions, results):
+            for (x, y, w, h) in region_boxes:
+                boxes.append((x + x0, y + y0, w, h))
+        return boxes
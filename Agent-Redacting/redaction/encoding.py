@@ -0,0 +1,50 @@
+#redaction/encoding.py
+from __future__ import annotations
+import base64
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class FrameEncoder:
+    """Encodes the redacted frame that is sent back to the model.
+
+    format is "png", "jpeg" or "webp". `quality` (1-100) applies to jpeg/webp
+    (webp above 100 is lossless); `png_compression` (0-9) trades CPU for size.
+    """
+
+    FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+    def __init__(self, format: str = "png", quality: int = 85, png_compression: int = 1):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported image format: {format}")
+        self.format = format
+        self.quality = quality
+        self.png_compression = png_compression
+
+    @property
+    def mime_type(self) -> str:
+        return self.FORMATS[self.format]
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self.format == "jpeg" else self.format
+
+    def _params(self) -> list:
+        import cv2
+        if self.format == "png":
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        if self.format == "jpeg":
+            return [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+
+    def encode(self, img: np.ndarray) -> bytes:
+        import cv2
+        ok, buf = cv2.imencode("." + self.extension, img, self._params())
+        if not ok:
+            raise ValueError(f"Could not encode frame as {self.format}")
+        return buf.tobytes()
+
+    def data_url(self, encoded: bytes) -> str:
+        return f"data:{self.mime_type};base64,{base64.b64encode(encoded).decode('utf-8')}"
@@ -0,0 +1,147 @@
+#redaction/incremental.py
+from __future__ import annotations
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Callable, List, Optional
+from .ocr import Box, word_boxes
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Rect = tuple[int, int, int, int]  # x0, y0, x1, y1
+
+
+def _intersects(box: Box, rect: Rect) -> bool:
+    x, y, w, h = box
+    return x < rect[2] and x + w > rect[0] and y < rect[3] and y + h > rect[1]
+
+
+def _merge_rects(rects: List[Rect]) -> List[Rect]:
+    """Merges overlapping rectangles until none of them overlap."""
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for r in rects:
+            for i, o in enumerate(out):
+                if r[0] < o[2] and r[2] > o[0] and r[1] < o[3] and r[3] > o[1]:
+                    out[i] = (min(r[0], o[0]), min(r[1], o[1]), max(r[2], o[2]), max(r[3], o[3]))
+                    merged = True
+                    break
+            else:
+                out.append(r)
+        rects = out
+    return rects
+
+
+class IncrementalRedactor:
+    """Keeps the OCR boxes of the last frame and only re-runs OCR on the tiles that changed.
+
+    Frames are compared tile by tile in grayscale. Changed tiles are grouped into
+    rectangles, padded so words on the tile edges are not cut, and OCR'd on their own;
+    cached boxes outside those rectangles are reused as they are.
+
+    `ocr` may be a plain function (run in a worker thread) or a coroutine function
+    such as OcrPool.word_boxes.
+    """
+
+    def __init__(
+        self,
+        tile_size: int = 64,
+        diff_threshold: int = 8,
+        margin: int = 16,
+        full_ocr_ratio: float = 0.5,
+        ocr: Callable = word_boxes,
+    ):
+        self.tile_size = tile_size
+        self.diff_threshold = diff_threshold
+        self.margin = margin
+        self.full_ocr_ratio = full_ocr_ratio
+        self.ocr = ocr
+        self._prev: Optional[np.ndarray] = None
+        self._boxes: List[Box] = []
+
+    def reset(self) -> None:
+        """Forgets the cached frame so the next call runs a full OCR pass."""
+        self._prev = None
+        self._boxes = []
+
+    def dirty_tiles(self, gray: np.ndarray) -> np.ndarray:
+        """Returns a (rows, cols) bool grid of the tiles that differ from the previous frame."""
+        import cv2
+        import numpy as np
+        t = self.tile_size
+        h, w = gray.shape
+        rows, cols = -(-h // t), -(-w // t)
+        diff = cv2.absdiff(gray, self._prev)
+        padded = np.zeros((rows * t, cols * t), dtype=np.uint8)
+        padded[:h, :w] = diff
+        return padded.reshape(rows, t, cols, t).max(axis=(1, 3)) > self.diff_threshold
+
+    def dirty_regions(self, gray: np.ndarray) -> Optional[List[Rect]]:
+        """Pixel rectangles that need a fresh OCR pass, or None when the whole frame does."""
+        if self._prev is None or self._prev.shape != gray.shape:
+            return None
+        grid = self.dirty_tiles(gray)
+        if grid.mean() > self.full_ocr_ratio:
+            return None
+        if not grid.any():
+            return []
+
+        import cv2
+        import numpy as np
+        t, m = self.tile_size, self.margin
+        h, w = gray.shape
+        n, _, stats, _ = cv2.connectedComponentsWithStats(grid.astype(np.uint8), connectivity=8)
+        rects = []
+        for i in range(1, n):
+            cx, cy, cw, ch = (int(v) for v in stats[i, :4])
+            rects.append((
+                max(0, cx * t - m),
+                max(0, cy * t - m),
+                min(w, (cx + cw) * t + m),
+                min(h, (cy + ch) * t + m),
+            ))
+
+        # Grow the regions over any cached word they clip, so no word is half re-OCR'd.
+        while True:
+            rects = _merge_rects(rects)
+            grown = []
+            for r in rects:
+                x0, y0, x1, y1 = r
+                for b in self._boxes:
+                    if _intersects(b, r):
+                        x0, y0 = min(x0, b[0]), min(y0, b[1])
+                        x1, y1 = max(x1, b[0] + b[2]), max(y1, b[1] + b[3])
+                grown.append((x0, y0, x1, y1))
+            if grown == rects:
+                return rects
+            rects = grown
+
+    async def _run_ocr(self, img: np.ndarray) -> List[Box]:
+        if inspect.iscoroutinefunction(self.ocr):
+            return await self.ocr(img)
+        return await asyncio.to_thread(self.ocr, img)
+
+    async def text_boxes(self, gray: np.ndarray, ocr_input: np.ndarray) -> List[Box]:
+        """Returns the word boxes for the current frame.
+
+        `gray` is the raw frame in grayscale (before any redaction) and is what gets
+        diffed; `ocr_input` is the image OCR actually runs on.
+        """
+        regions = self.dirty_regions(gray)
+        self._prev = gray
+        if regions is None:
+            self._boxes = await self._run_ocr(ocr_input)
+            return list(self._boxes)
+
+        boxes = [b for b in self._boxes if not any(_intersects(b, r) for r in regions)]
+        results = await asyncio.gather(*[
+            self._run_ocr(ocr_input[y0:y1, x0:x1]) for x0, y0, x1, y1 in regions
+        ])
+        for (x0, y0, _, _), region_boxes in zip(regions, results):
+            for (x, y, w, h) in region_boxes:
+                boxes.append((x + x0, y + y0, w, h))
+        self._boxes = boxes
+        return list(boxes)
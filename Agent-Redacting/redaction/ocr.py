@@ -0,0 +1,119 @@
+#redaction/ocr.py
+from __future__ import annotations
+import threading
+from typing import TYPE_CHECKING, Dict, List, Protocol, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Box = Tuple[int, int, int, int]
+
+
+class OcrBackend(Protocol):
+    """Anything that can turn an RGB frame into word boxes."""
+
+    name: str
+
+    def word_boxes(self, img_rgb: np.ndarray) -> List[Box]: ...
+
+
+class PytesseractBackend:
+    """Runs the tesseract CLI once per call through pytesseract (the original path)."""
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = "eng", config: str = ""):
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.lang = lang
+        self.config = config
+
+    def word_boxes(self, img_rgb: np.ndarray) -> List[Box]:
+        data = self._pytesseract.image_to_data(
+            img_rgb, lang=self.lang, config=self.config, output_type=self._pytesseract.Output.DICT
+        )
+        boxes = []
+        for i in range(len(data['level'])):
+            if data['text'][i].strip() != "":
+                boxes.append((data['left'][i], data['top'][i], data['width'][i], data['height'][i]))
+        return boxes
+
+
+class TesserocrBackend:
+    """Keeps one tesseract engine loaded in-process (via tesserocr) and reuses it for every frame.
+
+    The language data is loaded once in __init__; each call only hands the pixel
+    buffer over, with no subprocess, temp files or TSV parsing.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng"):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang=lang, psm=tesserocr.PSM.AUTO)
+        self._lock = threading.Lock()  # a TessBaseAPI handles one image at a time
+
+    def word_boxes(self, img_rgb: np.ndarray) -> List[Box]:
+        import numpy as np
+        img = np.ascontiguousarray(img_rgb)
+        h, w = img.shape[:2]
+        channels = 1 if img.ndim == 2 else img.shape[2]
+        level = self._tesserocr.RIL.WORD
+        boxes = []
+        with self._lock:
+            self._api.SetImageBytes(img.tobytes(), w, h, channels, w * channels)
+            self._api.Recognize()
+            iterator = self._api.GetIterator()
+            if iterator is None:
+                return boxes
+            for word in self._tesserocr.iterate_level(iterator, level):
+                text = word.GetUTF8Text(level)
+                box = word.BoundingBox(level)
+                if text and text.strip() != "" and box:
+                    x1, y1, x2, y2 = box
+                    boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+
+
+BACKENDS = {
+    "pytesseract": PytesseractBackend,
+    "tesserocr": TesserocrBackend,
+}
+DEFAULT_BACKEND = "auto"
+_loaded: Dict[str, OcrBackend] = {}
+
+
+def get_backend(name: str = DEFAULT_BACKEND) -> OcrBackend:
+    """Returns the process-wide instance of an OCR backend, creating it on first use.
+
+    "auto" prefers the in-process tesserocr engine and falls back to pytesseract
+    when tesserocr is not installed.
+    """
+    if name in _loaded:
+        return _loaded[name]
+    if name not in BACKENDS and name != "auto":
+        from . import detect  # registers the text detectors on first use
+    if name == "auto":
+        try:
+            backend = get_backend("tesserocr")
+        except ImportError:
+            backend = get_backend("pytesseract")
+    elif name in BACKENDS:
+        backend = BACKENDS[name]()
+    else:
+        raise ValueError(f"Unknown OCR backend: {name}")
+    _loaded[name] = backend
+    return backend
+
+
+def word_boxes(img_rgb, backend: str = DEFAULT_BACKEND) -> List[Box]:
+    """Runs OCR on an RGB image and returns (x, y, w, h) for every non-empty word."""
+    return get_backend(backend).word_boxes(img_rgb)
+
+
+def fill_boxes(img, boxes: List[Box], color=(255, 255, 255)) -> None:
+    """Paints every (x, y, w, h) box onto img in place."""
+    import cv2
+    for (x, y, w, h) in boxes:
+        cv2.rectangle(img, (x, y), (x + w, y + h), color, thickness=-1)
@@ -0,0 +1,107 @@
+#redaction/pool.py
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+import numpy as np
+from .ocr import DEFAULT_BACKEND, Box, get_backend
+
+
+def _ocr_tile(shm_name: str, shape: tuple, dtype: str, rect: tuple, backend: str) -> List[Box]:
+    """Worker entry point: OCRs one tile of the frame held in shared memory."""
+    # The parent owns and unlinks the block. Workers share its resource tracker, so they
+    # must not unregister it; on 3.13+ they can skip registering it at all.
+    try:
+        shm = SharedMemory(name=shm_name, track=False)
+    except TypeError:
+        shm = SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        x0, y0, x1, y1 = rect
+        # A full-width strip is already contiguous, so ascontiguousarray would return a
+        # view into the block; copy it before the block is unmapped.
+        tile = frame[y0:y1, x0:x1].copy()
+        del frame
+    finally:
+        shm.close()
+    return [(x + x0, y + y0, w, h) for (x, y, w, h) in get_backend(backend).word_boxes(tile)]
+
+
+def split_tiles(height: int, width: int, rows: int, cols: int = 1, overlap: int = 160) -> List[tuple]:
+    """Splits a frame into rows x cols (x0, y0, x1, y1) tiles that overlap by `overlap` pixels.
+
+    Full-width strips (cols=1) are the default since they never cut a line of text
+    sideways. Any line at most `overlap` pixels tall then lies wholly inside at least
+    one strip, as long as the strips are at least that tall themselves.
+    """
+    tiles = []
+    before, after = overlap // 2, overlap - overlap // 2
+    for r in range(rows):
+        y0 = max(0, r * height // rows - before)
+        y1 = min(height, (r + 1) * height // rows + after)
+        for c in range(cols):
+            x0 = max(0, c * width // cols - before)
+            x1 = min(width, (c + 1) * width // cols + after)
+            tiles.append((x0, y0, x1, y1))
+    return tiles
+
+
+class OcrPool:
+    """Runs OCR in a process pool, one tile per task, without blocking the event loop.
+
+    The frame is copied once into a shared-memory block and workers read their tile
+    straight out of it, so no pixel data is pickled per task. Each worker loads its
+    OCR backend once, when it starts.
+
+    Strips overlap by `max_line_height` and are never shorter than it, so text up to
+    that height is seen whole by at least one worker. Taller text can be cut in two
+    and missed; raise `max_line_height` for pages with bigger type.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        backend: str = DEFAULT_BACKEND,
+        max_line_height: int = 160,
+        min_tile_height: int = 320,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.max_line_height = max_line_height
+        self.min_tile_height = max(min_tile_height, max_line_height)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=get_backend, initargs=(backend,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def word_boxes(self, img_rgb: np.ndarray) -> List[Box]:
+        """Async drop-in for ocr.word_boxes that spreads the work over the pool."""
+        h, w = img_rgb.shape[:2]
+        rows = max(1, min(self.workers, h // self.min_tile_height))
+        tiles = split_tiles(h, w, rows, overlap=self.max_line_height)
+
+        shm = SharedMemory(create=True, size=max(1, img_rgb.nbytes))
+        try:
+            np.ndarray(img_rgb.shape, dtype=img_rgb.dtype, buffer=shm.buf)[:] = img_rgb
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*[
+                loop.run_in_executor(
+                    self._executor, _ocr_tile, shm.name, img_rgb.shape, img_rgb.dtype.str, rect,
+                    self.backend,
+                )
+                for rect in tiles
+            ])
+        finally:
+            shm.close()
+            shm.unlink()
+        # Words in the tile overlaps come back twice; painting a box twice is harmless.
+        return [b for tile_boxes in results for b in tile_boxes]
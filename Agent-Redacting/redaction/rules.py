@@ -0,0 +1,120 @@
+#redaction/rules.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Color = Tuple[int, int, int]  # BGR, like the frames coming out of cv2.imdecode
+
+
+@dataclass
+class ColorRule:
+    """Redacts every region of `color` (+/- tolerance per channel) of at least `min_area` pixels."""
+
+    color: Color
+    tolerance: int = 2
+    fill: Optional[Color] = None  # defaults to the matched colour
+    min_area: int = 1000
+
+
+@dataclass
+class BandRule:
+    """Draws a full-width line at `y_frac` of the frame height, shifted by `offset` pixels."""
+
+    y_frac: float
+    thickness: int = 5
+    offset: int = 0
+    color: Color = (255, 255, 255)
+
+
+class RedactionRules:
+    """Evaluates a whole palette of colour rules in one vectorised pass.
+
+    Each rule gets one bit. Three 256-entry lookup tables (one per channel) hold,
+    for every channel value, the bits of the rules whose range contains it, so
+    `lut_b[B] & lut_g[G] & lut_r[R]` gives every pixel's matching rules at once,
+    with the same per-channel box semantics as cv2.inRange. One connected-components
+    pass over the combined mask then yields every region, whatever rule it matched.
+    """
+
+    def __init__(self, colors: List[ColorRule] = (), bands: List[BandRule] = ()):
+        if len(colors) > 32:
+            raise ValueError("RedactionRules supports at most 32 colour rules")
+        self.colors = list(colors)
+        self.bands = list(bands)
+        self._tables = None
+
+    @property
+    def _luts(self) -> list:
+        """The per-channel lookup tables, built on first use."""
+        if self._tables is not None:
+            return self._tables
+        import numpy as np
+        dtype = np.uint8 if len(self.colors) <= 8 else np.uint16 if len(self.colors) <= 16 else np.uint32
+        luts = [np.zeros(256, dtype=dtype) for _ in range(3)]
+        values = np.arange(256)
+        for i, rule in enumerate(self.colors):
+            for channel, lut in enumerate(luts):
+                c = rule.color[channel]
+                inside = (values >= c - rule.tolerance) & (values <= c + rule.tolerance)
+                lut[inside] |= dtype(1 << i)
+        self._tables = luts
+        return luts
+
+    def match(self, img: np.ndarray) -> np.ndarray:
+        """Per-pixel bitmask of the colour rules each pixel satisfies."""
+        lut_b, lut_g, lut_r = self._luts
+        return lut_b[img[..., 0]] & lut_g[img[..., 1]] & lut_r[img[..., 2]]
+
+    def color_regions(self, img: np.ndarray) -> List[Tuple[int, int, int, int, int]]:
+        """Returns (x, y, w, h, rule_index) for every matching region above its rule's min_area.
+
+        A region touching pixels of several rules is attributed to one of them.
+        """
+        if not self.colors:
+            return []
+        bits = self.match(img)
+        hit = bits != 0
+        if not hit.any():
+            return []
+        import cv2
+        import numpy as np
+        n, labels, stats, _ = cv2.connectedComponentsWithStats(hit.view(np.uint8), connectivity=8)
+        owner = np.zeros(n, dtype=bits.dtype)
+        owner[labels[hit]] = bits[hit]
+        regions = []
+        for label in range(1, n):
+            b = int(owner[label])
+            rule_index = (b & -b).bit_length() - 1
+            x, y, w, h, area = (int(v) for v in stats[label])
+            if area >= self.colors[rule_index].min_area:
+                regions.append((x, y, w, h, rule_index))
+        return regions
+
+    def apply_colors(self, img: np.ndarray) -> List[Tuple[int, int, int, int, int]]:
+        """Fills the bounding box of every matching region in place and returns the regions."""
+        import cv2
+        regions = self.color_regions(img)
+        for x, y, w, h, rule_index in regions:
+            rule = self.colors[rule_index]
+            fill = rule.fill if rule.fill is not None else rule.color
+            cv2.rectangle(img, (x, y), (x + w, y + h), tuple(int(c) for c in fill), thickness=-1)
+        return regions
+
+    def apply_bands(self, img: np.ndarray) -> None:
+        """Draws the fixed bands in place."""
+        import cv2
+        h, w = img.shape[:2]
+        for band in self.bands:
+            y = int(h * band.y_frac) + band.offset
+            cv2.line(img, (0, y), (w, y), band.color, thickness=band.thickness)
+
+
+# The palette capture_and_display uses; add a ColorRule per code theme.
+DEFAULT_RULES = RedactionRules(
+    colors=[ColorRule(color=(59, 51, 45), tolerance=2, min_area=1000)],  # dark code box (BGR)
+    # Two horizontal white lines to mask possible leaked text at the bottom area
+    bands=[BandRule(y_frac=0.75, thickness=5), BandRule(y_frac=0.75, thickness=5, offset=-10)],
+)
@@ -0,0 +1,187 @@
+#runner.py
+"""Runs many agent sessions concurrently on one event loop and one browser.
+
+Each task borrows its own warm browser context and page from a BrowserContextPool
+and has its own response chain, redaction cache and journal
+(saved_conv/sessions/<task id>.jsonl). Tasks come from a file or any
+asyncio.Queue, not stdin:
+
+    python runner.py tasks.jsonl --concurrency 8
+    python runner.py tasks.txt --headless --results results.jsonl
+    python runner.py tasks.jsonl --trace trace.json
+
+tasks.jsonl lines look like {"id": "t1", "prompt": "...", "url": "https://..."};
+a plain text file is read as one prompt per line.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Iterable, Optional
+from client import ResponsesClient
+from computers import BrowserContextPool, LocalPlaywrightComputer
+from journal import SessionJournal
+from main2 import (
+    OCR_BACKEND, OUTPUT_ROI, OUTPUT_SCALE, SessionState, capture_and_display, read_api_key, run_turn,
+)
+from redaction import IncrementalRedactor, get_backend
+from tracing import DEFAULT_TRACE_FILE, export as export_trace, instrument_computer, tracer
+
+
+def load_tasks(path: str) -> list[dict]:
+    tasks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            task = json.loads(line) if line.startswith("{") else {"prompt": line}
+            task.setdefault("id", f"task{n}")
+            tasks.append(task)
+    return tasks
+
+
+class SessionRunner:
+    """Pulls tasks off a queue and runs up to `concurrency` of them at once."""
+
+    def __init__(
+        self,
+        client: ResponsesClient,
+        concurrency: int = 4,
+        cdp_url: Optional[str] = "http://localhost:9222",
+        headless: bool = False,
+        journal_dir: str = "saved_conv/sessions",
+        max_auto_yes: int = 5,
+        ocr_pool: Optional["OcrPool"] = None,
+        storage_state: Optional[str] = None,
+        share_profile: bool = False,
+    ):
+        self.client = client
+        self.concurrency = concurrency
+        self.cdp_url = None if headless else cdp_url
+        self.headless = headless
+        self.journal_dir = journal_dir
+        self.max_auto_yes = max_auto_yes
+        self.ocr_pool = ocr_pool
+        self.storage_state = storage_state
+        self.share_profile = share_profile
+        self.results = []
+
+    async def run_tasks(self, tasks: Iterable[dict]) -> list[dict]:
+        """Runs a fixed list of tasks and returns one result per task."""
+        queue = asyncio.Queue()
+        for task in tasks:
+            queue.put_nowait(task)
+        for _ in range(self.concurrency):
+            queue.put_nowait(None)
+        return await self.serve(queue)
+
+    async def serve(self, queue: asyncio.Queue) -> list[dict]:
+        """Runs tasks from `queue` until each worker has received a None sentinel."""
+        pool = BrowserContextPool(
+            cdp_url=self.cdp_url,
+            size=self.concurrency,
+            viewport=LocalPlaywrightComputer.viewport_size,
+            headless=self.headless,
+            storage_state=self.storage_state,
+            share_profile=self.share_profile,
+        )
+        async with pool:
+            await asyncio.gather(*[self._worker(pool, queue) for _ in range(self.concurrency)])
+        return self.results
+
+    async def _worker(self, pool: BrowserContextPool, queue: asyncio.Queue) -> None:
+        while True:
+            task = await queue.get()
+            try:
+                if task is None:
+                    return
+                self.results.append(await self.run_task(pool, task))
+            finally:
+                queue.task_done()
+
+    async def run_task(self, pool: BrowserContextPool, task: dict) -> dict:
+        task_id = str(task["id"])
+        journal = SessionJournal(os.path.join(self.journal_dir, task_id + ".jsonl"))
+        ocr = self.ocr_pool.word_boxes if self.ocr_pool else get_backend(OCR_BACKEND).word_boxes
+        state = SessionState(journal=journal, name=task_id, redactor=IncrementalRedactor(ocr=ocr))
+        tracer.set_context(session=task_id)
+        start = time.perf_counter()
+        result = {"id": task_id}
+        try:
+            async with LocalPlaywrightComputer(pool=pool) as computer:
+                instrument_computer(computer)
+                computer.set_output(OUTPUT_SCALE, OUTPUT_ROI)
+                if task.get("url"):
+                    await computer.goto(task["url"])
+                await capture_and_display(computer, "initial_page", session_redactor=state.redactor, save_redacted=False)
+                text = task["prompt"]
+                for _ in range(self.max_auto_yes + 1):
+                    if not await run_turn(self.client, computer, text, state):
+                        break
+                    state.log("💬 Auto-responding with: yes")
+                    text = "yes"
+                    await computer.wait_until_stable(timeout_ms=3000)
+            result["status"] = "done"
+        except Exception as e:
+            state.log(f"❌ Session failed: {e}")
+            result.update(status="error", error=str(e))
+        finally:
+            journal.close()
+        result.update(
+            previous_response_id=state.previous_response_id,
+            steps=state.step,
+            seconds=time.perf_counter() - start,
+        )
+        return result
+
+
+async def amain(args):
+    if args.trace:
+        tracer.enabled = True
+    client = ResponsesClient(api_key=os.getenv("OPENAI_API_KEY") or read_api_key())
+    from redaction import OcrPool
+    ocr_pool = OcrPool(workers=args.ocr_workers, backend=OCR_BACKEND) if args.ocr_workers != 0 else None
+    runner = SessionRunner(
+        client,
+        concurrency=args.concurrency,
+        cdp_url=args.cdp,
+        headless=args.headless,
+        max_auto_yes=args.max_auto_yes,
+        ocr_pool=ocr_pool,
+        storage_state=args.storage_state,
+        share_profile=args.share_profile,
+    )
+    try:
+        results = await runner.run_tasks(load_tasks(args.tasks))
+    finally:
+        await client.aclose()
+        if ocr_pool:
+            ocr_pool.close()
+        export_trace(args.trace)
+    with open(args.results, "w", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps(r) + "\n")
+    print(f"✅ {sum(r['status'] == 'done' for r in results)}/{len(results)} sessions done; results in {args.results}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tasks", help="JSONL file of tasks, or a text file with one prompt per line")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cdp", default="http://localhost:9222", help="Chrome to attach to over CDP")
+    parser.add_argument("--headless", action="store_true", help="launch a headless Chromium instead of using --cdp")
+    parser.add_argument("--storage-state", help="storage_state JSON each session's fresh context starts from (e.g. a login)")
+    parser.add_argument("--share-profile", action="store_true",
+                        help="open sessions as tabs in the browser's default profile (shared logins and state)")
+    parser.add_argument("--max-auto-yes", type=int, default=5)
+    parser.add_argument("--ocr-workers", type=int, default=None, help="OCR pool size; 0 runs OCR in threads")
+    parser.add_argument("--results", default="results.jsonl")
+    parser.add_argument("--trace", nargs="?", const=DEFAULT_TRACE_FILE,
+                        help="record per-step spans and write them to this file (AGENT_TRACE=1 also records them)")
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
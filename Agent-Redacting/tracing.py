@@ -0,0 +1,159 @@
+#tracing.py
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Optional
+
+# Step / response ids attached to every span; per asyncio task, so concurrent sessions don't mix.
+_context = contextvars.ContextVar("trace_context", default={})
+
+# Where export() writes the trace when the caller doesn't name a file.
+DEFAULT_TRACE_FILE = os.getenv("AGENT_TRACE_FILE", "trace.json")
+# Upper edges (ms) of the histogram buckets; the last bucket is open-ended.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer._record(self.name, self.start, time.perf_counter_ns(), self.args, exc_type)
+        return False
+
+
+class Tracer:
+    """Timed spans for the agent loop, exported as a Chrome trace and rolling histograms.
+
+    Disabled by default: span() then returns a shared no-op context manager, so
+    instrumented code pays one attribute check per span.
+    """
+
+    def __init__(self, enabled: bool = False, max_events: int = 200_000, window: int = 1000):
+        self.enabled = enabled
+        self._events = deque(maxlen=max_events)
+        self._durations = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+
+    def set_context(self, **values) -> None:
+        """Adds ids (step, response_id, session...) to every span recorded from this task on."""
+        _context.set({**_context.get(), **values})
+
+    def span(self, name: str, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _record(self, name, start_ns, end_ns, args, exc_type) -> None:
+        ctx = _context.get()
+        event = {
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": ctx.get("session", threading.get_ident()),
+            "args": {**ctx, **args, **({"error": exc_type.__name__} if exc_type else {})},
+        }
+        with self._lock:
+            self._events.append(event)
+            self._durations[name].append((end_ns - start_ns) / 1e6)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the recorded spans in Chrome trace format (chrome://tracing, ui.perfetto.dev)."""
+        with self._lock:
+            events = list(self._events)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def histograms(self) -> dict:
+        """Latency summary and bucket counts over the last `window` samples of every span."""
+        with self._lock:
+            durations = {name: sorted(d) for name, d in self._durations.items()}
+        out = {}
+        for name, values in durations.items():
+            if not values:
+                continue
+            counts = [0] * (len(BUCKETS_MS) + 1)
+            for v in values:
+                counts[next((i for i, edge in enumerate(BUCKETS_MS) if v <= edge), len(BUCKETS_MS))] += 1
+            out[name] = {
+                "n": len(values),
+                "p50_ms": values[len(values) // 2],
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))],
+                "max_ms": values[-1],
+                "buckets_ms": dict(zip([f"<={e}" for e in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"], counts)),
+            }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._durations.clear()
+
+
+tracer = Tracer(enabled=os.getenv("AGENT_TRACE") == "1")
+
+
+def export(path: Optional[str] = None, log=print, t: Optional[Tracer] = None) -> None:
+    """Writes the Chrome trace (to DEFAULT_TRACE_FILE unless `path` is given) and logs
+    a latency line per span. Does nothing when tracing is off."""
+    t = t or tracer
+    if not t.enabled:
+        return
+    path = path or DEFAULT_TRACE_FILE
+    t.export_chrome_trace(path)
+    for name, h in t.histograms().items():
+        log(f"⏱️ {name}: n={h['n']} p50={h['p50_ms']:.1f}ms p95={h['p95_ms']:.1f}ms max={h['max_ms']:.1f}ms")
+    log(f"⏱️ Trace written to {path}")
+
+
+def instrument_computer(computer, prefix: str = "computer", t: Optional[Tracer] = None):
+    """Wraps every public coroutine method of a computer instance in a span."""
+    t = t or tracer
+    if not t.enabled:
+        return computer
+    for name in dir(type(computer)):
+        if name.startswith("_"):
+            continue
+        method = getattr(computer, name)
+        if not inspect.iscoroutinefunction(method):
+            continue
+
+        def wrap(method, span_name):
+            @functools.wraps(method)
+            async def traced(*args, **kwargs):
+                with t.span(span_name):
+                    return await method(*args, **kwargs)
+            return traced
+
+        setattr(computer, name, wrap(method, f"{prefix}.{name}"))
+    return computer
@@ -1,13 +1,22 @@
 import os
-import requests
-from dotenv import load_dotenv
 import json
 import base64
-from PIL import Image
 from io import BytesIO
 import io
 
-load_dotenv()
+# Created (and .env loaded) by the first create_response(); reused afterwards so
+# consecutive requests share keep-alive connections.
+_session = None
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        import requests
+        from dotenv import load_dotenv
+        load_dotenv()
+        _session = requests.Session()
+    return _session
 
 
 def pp(obj):
@@ -15,18 +24,21 @@ def pp(obj):
 
 
 def show_image(base_64_image):
+    from PIL import Image
     image_data = base64.b64decode(base_64_image)
     image = Image.open(BytesIO(image_data))
     image.show()
 
 
 def calculate_image_dimensions(base_64_image):
+    from PIL import Image
     image_data = base64.b64decode(base_64_image)
     image = Image.open(io.BytesIO(image_data))
     return image.size
 
 
 def create_response(**kwargs):
+    session = _get_session()
     url = "https://api.openai.com/v1/responses"
     headers = {
         "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
@@ -34,7 +46,7 @@ def create_response(**kwargs):
         "Content-Type": "application/json",
         "Openai-beta": "responses=v1",
     }
-    response = requests.post(url, headers=headers, json=kwargs)
+    response = session.post(url, headers=headers, json=kwargs, timeout=120)
     if response.status_code != 200:
         print("Error:", response.status_code, response.text)
     return response.json()
@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from index import parse_query
+
+
+def normalize_query(query: str, k: int) -> Hashable:
+    """Cache key for a search: queries that parse to the same terms and phrases share it.
+
+    Loose terms are OR'ed, so their order and repetition don't change the result.
+    """
+    terms, phrases = parse_query(query)
+    return tuple(sorted(set(terms))), tuple(sorted(tuple(p) for p in phrases)), k
+
+
+class QueryCache:
+    """Bounded LRU of search results with a TTL, keyed by normalised query and corpus version.
+
+    Bump the version whenever the corpus changes: entries are stamped with the version
+    they were computed under and are never served under another one.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, tuple[float, int, Any]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, version, value = entry
+            if version == self.version and expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+            self.expired += 1
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, self.version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def bump_version(self, version: Optional[int] = None) -> int:
+        """Marks the corpus as changed (to `version`, or the next one); nothing cached
+        before this is served again."""
+        self.version = self.version + 1 if version is None else version
+        self._entries.clear()
+        return self.version
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
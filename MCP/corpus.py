@@ -0,0 +1,236 @@
+import glob
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from index import MappedIndex, SearchIndex, parse_query
+from store import DiskStore, open_store, remove_store, source_stamp
+
+
+class Segment:
+    """One immutable slice of the corpus: a store plus its search index.
+
+    A DiskStore's index is the `.pst` file compiled with it, mapped rather than
+    rebuilt; an in-memory store is indexed when the segment is created.
+
+    `stamp` is the (size, mtime) of the source file the store was compiled from.
+    """
+
+    def __init__(self, name: str, store, stamp: Optional[Tuple[int, int]] = None):
+        self.name = name
+        self.store = store
+        self.stamp = stamp
+        if isinstance(store, DiskStore):
+            self.index = MappedIndex(store.prefix + ".pst", store.ids)
+        else:
+            self.index = SearchIndex(store.iter_docs())
+
+    @classmethod
+    def load(cls, path: str) -> "Segment":
+        store = open_store(path)
+        return cls(os.path.basename(path), store, store.source_stamp)
+
+    def close(self) -> None:
+        self.index.close()
+        self.store.close()
+
+
+class Snapshot:
+    """A consistent view over an ordered list of segments; later segments win.
+
+    A document found in (or deleted by) a newer segment is hidden in every older
+    one, both from fetches and from search. Snapshots are never modified, so a
+    request that grabbed one keeps a stable corpus while the next one is built.
+    """
+
+    def __init__(self, segments: List[Segment], version: int):
+        self.segments = segments
+        self.version = version
+        # Only ids that a newer segment adds or deletes can hide a document, and
+        # segments after the base are small, so just those are looked up in older stores.
+        self._hidden: List[set] = []
+        newer = set()
+        for i in range(len(segments) - 1, -1, -1):
+            store = segments[i].store
+            hidden = set(store.shadowed)
+            for doc_id in newer:
+                docno = store.docno(doc_id)
+                if docno is not None:
+                    hidden.add(docno)
+            self._hidden.append(hidden)
+            if i:
+                newer.update(store.ids)
+                newer |= store.deleted
+        self._hidden.reverse()
+        self._length = sum(len(seg.index) for seg in segments)
+        self._total_length = sum(seg.index.total_length for seg in segments)
+        self._live = self._length - sum(map(len, self._hidden))
+
+    def _store(self, doc_id: str):
+        """The store serving `doc_id`: the newest segment that has or deletes it decides."""
+        for seg in reversed(self.segments):
+            if doc_id in seg.store:
+                return seg.store
+            if doc_id in seg.store.deleted:
+                break
+        raise KeyError(doc_id)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, doc_id: str) -> bool:
+        try:
+            self._store(doc_id)
+        except KeyError:
+            return False
+        return True
+
+    def get(self, doc_id: str, *args, **kwargs) -> Dict:
+        return self._store(doc_id).get(doc_id, *args, **kwargs)
+
+    def title(self, doc_id: str) -> str:
+        return self._store(doc_id).title(doc_id)
+
+    def snippet(self, doc_id: str, length: int = 160, terms: Iterable[str] = ()) -> str:
+        return self._store(doc_id).snippet(doc_id, length, terms)
+
+    def chunk_offsets(self, doc_id: str) -> Sequence[int]:
+        return self._store(doc_id).chunk_offsets(doc_id)
+
+    def text_range(self, doc_id: str, offset: int, length: int) -> str:
+        return self._store(doc_id).text_range(doc_id, offset, length)
+
+    def text_length(self, doc_id: str) -> int:
+        return self._store(doc_id).text_length(doc_id)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[float, str]]:
+        """Top `k` (score, id) pairs across all segments, scored with corpus-wide BM25 statistics."""
+        if not self._length:
+            return []
+        terms, phrases = parse_query(query)
+        dfs = {t: sum(seg.index.doc_freq(t) for seg in self.segments) for t in set(terms).union(*phrases)}
+        stats = (self._length, self._total_length / self._length, dfs)
+        results = [
+            seg.index.search(query, k, exclude=hidden, stats=stats)
+            for seg, hidden in zip(self.segments, self._hidden)
+        ]
+        return heapq.nlargest(k, (hit for hits in results for hit in hits), key=lambda hit: hit[0])
+
+
+class LiveCorpus:
+    """The current Snapshot of a base store plus every `*.jsonl` segment in a directory.
+
+    A background thread polls the directory; new, changed or removed segment files
+    are (re)compiled and indexed off to the side, then a new Snapshot replaces
+    `current` in a single assignment. Segments apply in file-name order, so name
+    them by time (e.g. 2024-06-01T10.jsonl). A line {"id": ..., "deleted": true}
+    removes a document.
+
+    Segments that were replaced or removed stay open for `retire_after` seconds, so
+    requests still holding an older snapshot can finish, then they are closed. The
+    compiled files of a removed segment are deleted once nothing uses them.
+    """
+
+    def __init__(
+        self,
+        base,
+        directory: Optional[str] = None,
+        poll_interval: float = 10.0,
+        on_swap: Iterable[Callable[["Snapshot"], None]] = (),
+        retire_after: float = 60.0,
+    ):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.on_swap = list(on_swap)
+        self.retire_after = retire_after
+        self._base = Segment("base", base)
+        self._segments: Dict[str, Segment] = {}
+        self._retired: List[Tuple[float, Segment]] = []  # (retired at, segment)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.current = Snapshot([self._base], 0)
+        if directory:
+            self.refresh()
+
+    def _segment_files(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for path in glob.glob(os.path.join(self.directory, "*.jsonl")):
+            try:
+                files[os.path.basename(path)] = source_stamp(path)
+            except FileNotFoundError:  # removed between glob and stat
+                pass
+        return files
+
+    def _close_retired(self, force: bool = False) -> None:
+        deadline = time.monotonic() - self.retire_after
+        keep = []
+        for retired_at, seg in self._retired:
+            if force or retired_at <= deadline:
+                seg.close()
+            else:
+                keep.append((retired_at, seg))
+        self._retired = keep
+
+    def _remove_orphans(self, files: Dict[str, Tuple[int, int]]) -> None:
+        """Deletes compiled stores whose `.jsonl` is gone and that no open segment uses."""
+        in_use = {seg.store.prefix for seg in self._segments.values()}
+        in_use |= {seg.store.prefix for _, seg in self._retired}
+        for idx in glob.glob(os.path.join(self.directory, "*.idx")):
+            prefix = idx[: -len(".idx")]
+            if os.path.basename(prefix) + ".jsonl" not in files and prefix not in in_use:
+                remove_store(prefix)
+
+    def refresh(self) -> bool:
+        """Picks up segment changes now; returns True when a new snapshot was swapped in."""
+        self._close_retired()
+        files = self._segment_files()
+        segments = {}
+        changed = set(self._segments) - set(files)
+        for name, stamp in files.items():
+            seg = self._segments.get(name)
+            if seg is None or seg.stamp != stamp:
+                try:
+                    seg = Segment.load(os.path.join(self.directory, name))
+                except Exception as e:  # half-written file; try again on the next poll
+                    print(f"⚠️ Skipping segment {name}: {e}")
+                    if name in self._segments:
+                        segments[name] = self._segments[name]
+                    continue
+                changed.add(name)
+            segments[name] = seg
+        if not changed:
+            self._remove_orphans(files)
+            return False
+        now = time.monotonic()
+        self._retired += [
+            (now, seg) for name, seg in self._segments.items() if segments.get(name) is not seg
+        ]
+        self._segments = segments
+        self._remove_orphans(files)
+        snapshot = Snapshot([self._base] + [segments[n] for n in sorted(segments)], self.current.version + 1)
+        self.current = snapshot
+        for callback in self.on_swap:
+            callback(snapshot)
+        return True
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Corpus refresh failed: {e}")
+
+    def start(self) -> "LiveCorpus":
+        if self.directory and self._thread is None:
+            self._thread = threading.Thread(target=self._poll, name="corpus-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._close_retired(force=True)
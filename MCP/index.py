@@ -0,0 +1,333 @@
+import heapq
+import math
+import mmap
+import os
+import pickle
+import re
+import shutil
+import struct
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate, chain, groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+PHRASE_RE = re.compile(r'"([^"]*)"')
+FIELD_GAP = 8  # positions skipped between title and text so phrases don't span them
+PST_MAGIC = b"MCPPST01"
+PST_HEADER = struct.Struct("<8sQQQQQ")  # magic, docs, terms, postings, positions, total length
+BLOCK_TOKENS = 4_000_000  # tokens IndexWriter holds in memory before writing a sorted run
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Splits a query into loose terms and "quoted phrases" (each a list of terms)."""
+    phrases = []
+    for p in PHRASE_RE.findall(query):
+        terms = tokenize(p)
+        if len(terms) > 1:
+            phrases.append(terms)
+    rest = PHRASE_RE.sub(lambda m: m.group(1) if len(tokenize(m.group(1))) == 1 else " ", query)
+    return tokenize(rest), phrases
+
+
+def doc_postings(title: str, text: str) -> Tuple[Dict[str, List[int]], int]:
+    """Positions of each term in a document, and its length in tokens."""
+    positions: Dict[str, List[int]] = defaultdict(list)
+    pos = count = 0
+    for field in (title, text):
+        for term in tokenize(field):
+            positions[term].append(pos)
+            pos += 1
+            count += 1
+        pos += FIELD_GAP
+    return positions, count
+
+
+class _Bm25:
+    """BM25 search and phrase checks over postings returned by `_lookup`.
+
+    `_lookup(term)` gives three sequences: doc numbers, offsets into the positions
+    sequence (one more than the number of docs, so tf = starts[i + 1] - starts[i]),
+    and the positions. Subclasses set `ids`, `lengths`, `total_length`, `k1` and `b`.
+    """
+
+    def _lookup(self, term: str) -> Optional[Tuple[Sequence[int], Sequence[int], Sequence[int]]]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def doc_freq(self, term: str) -> int:
+        p = self._lookup(term)
+        return len(p[0]) if p else 0
+
+    def _positions(self, term: str, docno: int) -> Optional[Sequence[int]]:
+        p = self._lookup(term)
+        if not p:
+            return None
+        nos, starts, positions = p
+        i = bisect_left(nos, docno)
+        if i == len(nos) or nos[i] != docno:
+            return None
+        return positions[starts[i]:starts[i + 1]]
+
+    def has_phrase(self, docno: int, phrase: List[str]) -> bool:
+        """True when the terms of `phrase` appear next to each other, in order, in the doc."""
+        candidates = None
+        for offset, term in enumerate(phrase):
+            positions = self._positions(term, docno)
+            if positions is None:
+                return False
+            shifted = {p - offset for p in positions}
+            candidates = shifted if candidates is None else candidates & shifted
+            if not candidates:
+                return False
+        return True
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        exclude: Optional[set] = None,
+        stats: Optional[Tuple[int, float, Dict[str, int]]] = None,
+    ) -> List[Tuple[float, str]]:
+        """Returns up to `k` (score, id) pairs, best first.
+
+        Loose terms are OR'ed together; every quoted phrase must match. `exclude`
+        skips doc numbers (deleted docs). `stats` overrides (doc count, average
+        length, doc frequencies) when several indexes are searched as one corpus.
+        """
+        terms, phrases = parse_query(query)
+        all_terms = set(terms).union(*phrases)
+        if not all_terms or not self.ids:
+            return []
+        n, avgdl, dfs = stats or (len(self.ids), self.total_length / len(self.ids), None)
+        k1, b = self.k1, self.b
+        lengths = self.lengths
+        scores: Dict[int, float] = defaultdict(float)
+        for term in all_terms:
+            p = self._lookup(term)
+            if not p:
+                continue
+            nos, starts, _ = p
+            df = dfs.get(term, len(nos)) if dfs is not None else len(nos)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i, docno in enumerate(nos):
+                tf = starts[i + 1] - starts[i]
+                norm = k1 * (1 - b + b * lengths[docno] / avgdl) if avgdl else k1
+                scores[docno] += idf * tf * (k1 + 1) / (tf + norm)
+
+        candidates = scores.items()
+        if exclude:
+            candidates = ((d, s) for d, s in candidates if d not in exclude)
+        if phrases:
+            candidates = ((d, s) for d, s in candidates if all(self.has_phrase(d, ph) for ph in phrases))
+        top = heapq.nlargest(k, candidates, key=lambda item: item[1])
+        return [(score, self.ids[docno]) for docno, score in top]
+
+    def close(self) -> None:
+        pass
+
+
+class SearchIndex(_Bm25):
+    """Positional inverted index over (id, title, text) documents, ranked with BM25.
+
+    Built in memory from its documents and read-only afterwards. Each term's
+    postings are three flat arrays; see _Bm25.
+    """
+
+    def __init__(self, docs: Iterable[Tuple[str, str, str]] = (), k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.lengths = array("I")
+        building: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+        for doc_id, title, text in docs:
+            docno = len(self.ids)
+            self.ids.append(doc_id)
+            positions, count = doc_postings(title, text)
+            for term, term_positions in positions.items():
+                building[term][docno] = term_positions
+            self.lengths.append(count)
+        self.total_length = sum(self.lengths)
+
+        self._postings: Dict[str, Tuple[array, array, array]] = {}
+        for term, docs_positions in building.items():
+            self._postings[term] = (
+                array("I", docs_positions.keys()),
+                array("I", accumulate(map(len, docs_positions.values()), initial=0)),
+                array("I", chain.from_iterable(docs_positions.values())),
+            )
+
+    def _lookup(self, term: str) -> Optional[Tuple[array, array, array]]:
+        return self._postings.get(term)
+
+
+def _align(f) -> None:
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def _read_run(path: str) -> Iterator[Tuple[str, array, array, array]]:
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+class IndexWriter:
+    """Writes the postings of documents added one at a time to a `.pst` file for MappedIndex.
+
+    Postings are collected in memory until BLOCK_TOKENS tokens have been added,
+    then written out as a sorted run next to `path`; close() merges the runs
+    term by term. Memory use is bounded by the block size and the term list,
+    not the corpus.
+
+    Layout: a header, then the doc lengths (uint32), per-term offsets into the
+    postings (uint64, T + 1), per-term offsets into the term blob (uint64, T + 1),
+    per-posting offsets into the positions (uint64, P + 1), the posting doc
+    numbers (uint32), the positions (uint32) and the terms as sorted UTF-8, each
+    section aligned to 8 bytes.
+    """
+
+    def __init__(self, path: str, block_tokens: int = BLOCK_TOKENS):
+        self.path = path
+        self.block_tokens = block_tokens
+        self.lengths = array("I")
+        self._block: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        self._block_size = 0
+        self._runs: List[str] = []
+
+    def add(self, title: str, text: str) -> None:
+        docno = len(self.lengths)
+        positions, count = doc_postings(title, text)
+        for term, term_positions in positions.items():
+            self._block[term].append((docno, term_positions))
+        self.lengths.append(count)
+        self._block_size += count
+        if self._block_size >= self.block_tokens:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._block:
+            return
+        path = f"{self.path}.run{len(self._runs)}"
+        with open(path, "wb") as f:
+            for term in sorted(self._block):
+                postings = self._block[term]
+                pickle.dump((
+                    term,
+                    array("I", (docno for docno, _ in postings)),
+                    array("I", (len(p) for _, p in postings)),
+                    array("I", chain.from_iterable(p for _, p in postings)),
+                ), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._runs.append(path)
+        self._block = defaultdict(list)
+        self._block_size = 0
+
+    def close(self) -> None:
+        self._flush()
+        term_post, term_offsets = array("Q", [0]), array("Q", [0])
+        n_postings = n_positions = 0
+        # Runs cover increasing doc numbers and heapq.merge keeps run order for equal
+        # terms, so each term's postings come out sorted by doc number.
+        merged = heapq.merge(*map(_read_run, self._runs), key=itemgetter(0))
+        with open(self.path + ".terms", "wb") as blob, open(self.path + ".starts", "wb") as starts, \
+                open(self.path + ".docs", "wb") as docs, open(self.path + ".pos", "wb") as positions:
+            starts.write(array("Q", [0]).tobytes())
+            for term, group in groupby(merged, key=itemgetter(0)):
+                for _, nos, counts, term_positions in group:
+                    docs.write(nos.tobytes())
+                    positions.write(term_positions.tobytes())
+                    offsets = array("Q", accumulate(counts, initial=n_positions))
+                    starts.write(offsets[1:].tobytes())
+                    n_postings += len(nos)
+                    n_positions = offsets[-1]
+                term_post.append(n_postings)
+                term_offsets.append(term_offsets[-1] + blob.write(term.encode("utf-8")))
+        with open(self.path, "wb") as out:
+            out.write(PST_HEADER.pack(
+                PST_MAGIC, len(self.lengths), len(term_post) - 1, n_postings, n_positions, sum(self.lengths),
+            ))
+            for table in (self.lengths, term_post, term_offsets):
+                out.write(table.tobytes())
+                _align(out)
+            for ext in (".starts", ".docs", ".pos", ".terms"):
+                with open(self.path + ext, "rb") as f:
+                    shutil.copyfileobj(f, out)
+                _align(out)
+                os.remove(self.path + ext)
+        for run in self._runs:
+            os.remove(run)
+        self._runs = []
+
+
+class MappedIndex(_Bm25):
+    """The postings written by IndexWriter, searched in place from a memory-mapped `.pst` file.
+
+    Nothing is loaded at open beyond the header; terms are found by binary search
+    over the mapped term table, so the page cache (not the process) holds the index.
+    `ids` are the document ids by doc number, as kept by the store.
+    """
+
+    def __init__(self, path: str, ids: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = ids
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, terms, postings, positions, self.total_length = PST_HEADER.unpack_from(self._map)
+        if magic != PST_MAGIC:
+            raise ValueError(f"{path} is not a postings file")
+        if n != len(ids):
+            raise ValueError(f"{path} indexes {n} documents, the store has {len(ids)}")
+        self._n_terms = terms
+        view = memoryview(self._map)
+        self._views = [view]
+        offset = PST_HEADER.size
+
+        def section(fmt: str, count: int) -> memoryview:
+            nonlocal offset
+            size = count * (8 if fmt == "Q" else 4)
+            table = view[offset:offset + size].cast(fmt)
+            self._views.append(table)
+            offset += size + (-size % 8)
+            return table
+
+        self.lengths = section("I", n)
+        self._term_post = section("Q", terms + 1)
+        self._term_offsets = section("Q", terms + 1)
+        self._starts = section("Q", postings + 1)
+        self._docnos = section("I", postings)
+        self._all_positions = section("I", positions)
+        self._terms_at = offset
+
+    def _term(self, i: int) -> bytes:
+        return self._map[self._terms_at + self._term_offsets[i]:self._terms_at + self._term_offsets[i + 1]]
+
+    def _lookup(self, term: str) -> Optional[Tuple[memoryview, memoryview, memoryview]]:
+        key = term.encode("utf-8")
+        lo, hi = 0, self._n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._n_terms or self._term(lo) != key:
+            return None
+        first, last = self._term_post[lo], self._term_post[lo + 1]
+        return self._docnos[first:last], self._starts[first:last + 1], self._all_positions
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,121 @@
+"""Load generator for the MCP server: concurrent search/fetch/fetch_many against a running instance.
+
+    python server.py &
+    python loadgen.py --url http://localhost:5000/sse/ --concurrency 32 --duration 30
+
+Each worker keeps its own client session and loops over the query list, following
+every search with a fetch (or one fetch_many) of its hits, until the deadline.
+Reports requests/sec and latency percentiles per tool.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport, StreamableHttpTransport
+
+# The server speaks Streamable HTTP even though its path is /sse/, so the transport is
+# picked explicitly instead of letting Client guess it from the URL.
+TRANSPORTS = {"http": StreamableHttpTransport, "sse": SSETransport}
+DEFAULT_QUERIES = ["hello", "world", "content", "doc", '"hello world"', "first second"]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def hit_ids(result) -> list:
+    data = getattr(result, "structured_content", None) or {}
+    return [hit["id"] for hit in data.get("results", [])]
+
+
+async def worker(url, queries, deadline, args, timings, errors, rng):
+    async with Client(TRANSPORTS[args.transport](url)) as client:
+
+        async def call(tool, params):
+            start = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, params)
+            except Exception as e:
+                errors[f"{tool}: {type(e).__name__}"] += 1
+                return None
+            timings[tool].append((time.perf_counter() - start) * 1000)
+            return result
+
+        while time.monotonic() < deadline:
+            result = await call("search", {"query": rng.choice(queries)})
+            ids = hit_ids(result)[: args.fetch_per_search] if result else []
+            if not ids or rng.random() >= args.fetch_ratio:
+                continue
+            if args.batch:
+                await call("fetch_many", {"ids": ids})
+            else:
+                for doc_id in ids:
+                    await call("fetch", {"id": doc_id})
+
+
+async def amain(args):
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    timings = defaultdict(list)
+    errors = defaultdict(int)
+    start = time.monotonic()
+    deadline = start + args.duration
+    await asyncio.gather(*[
+        worker(args.url, queries, deadline, args, timings, errors, random.Random(args.seed + i))
+        for i in range(args.concurrency)
+    ])
+    elapsed = time.monotonic() - start
+
+    report = {"elapsed_s": elapsed, "concurrency": args.concurrency, "tools": {}, "errors": dict(errors)}
+    total = 0
+    for tool, samples in sorted(timings.items()):
+        total += len(samples)
+        report["tools"][tool] = {
+            "n": len(samples),
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50),
+            "p90_ms": percentile(samples, 90),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": max(samples),
+        }
+    report["total_rps"] = total / elapsed
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{total} requests in {elapsed:.1f}s with {args.concurrency} clients: {report['total_rps']:.1f} req/s")
+    for tool, s in report["tools"].items():
+        print(f"  {tool:<11} n={s['n']:<7} {s['rps']:8.1f} req/s  p50 {s['p50_ms']:7.2f}  "
+              f"p90 {s['p90_ms']:7.2f}  p99 {s['p99_ms']:7.2f}  max {s['max_ms']:7.2f} ms")
+    for name, count in sorted(errors.items()):
+        print(f"  ⚠️ {name}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000/sse/")
+    parser.add_argument("--transport", choices=sorted(TRANSPORTS), default="http", help="how the server at --url is served")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client sessions")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--queries", help="file with one query per line (defaults to a few demo queries)")
+    parser.add_argument("--fetch-ratio", type=float, default=1.0, help="share of searches followed by a fetch")
+    parser.add_argument("--fetch-per-search", type=int, default=5, help="hits fetched after each search")
+    parser.add_argument("--batch", action="store_true", help="fetch the hits with one fetch_many call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    asyncio.run(amain(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,34 @@
+import os
 from typing import List, Optional
 from pydantic import BaseModel
 from fastmcp import FastMCP
+from cache import QueryCache, normalize_query
+from corpus import LiveCorpus
+from index import parse_query
+from store import FIELDS, MemoryStore, open_store
 
 RECORDS = [
     {"id": "doc1", "title": "First doc", "text": "Hello world."},
     {"id": "doc2", "title": "Second doc", "text": "More content."},
 ]
-LOOKUP = {r["id"]: r for r in RECORDS}
+# Set MCP_CORPUS to a .jsonl corpus (compiled to memory-mapped .dat/.idx/.chk/.pst files
+# on first use) to serve it instead of the demo records above.
+CORPUS_FILE = os.environ.get("MCP_CORPUS")
+# Drop *.jsonl segment files into MCP_SEGMENTS_DIR to add, replace or delete documents
+# while the server runs; they are indexed in the background and swapped in atomically.
+SEGMENTS_DIR = os.environ.get("MCP_SEGMENTS_DIR")
+POLL_INTERVAL = float(os.environ.get("MCP_POLL_INTERVAL", "10"))
+TOP_K = 20  # hits returned per search
+MAX_BATCH = 100  # ids per fetch_many call
+MAX_FETCH_CHARS = 200_000  # longest text piece one fetch returns; longer documents are paged
+MAX_BATCH_TEXT_CHARS = 20_000  # text per document in a fetch_many reply; read on with fetch
+SNIPPET_CHARS = 160
+SEARCH_CACHE = QueryCache(maxsize=4096, ttl=600)  # follows CORPUS.current.version
+CORPUS = LiveCorpus(
+    open_store(CORPUS_FILE) if CORPUS_FILE else MemoryStore(RECORDS),
+    SEGMENTS_DIR,
+    poll_interval=POLL_INTERVAL,
+).start()
 
 mcp = FastMCP(name="MCP", instructions="Demo Deep‑Research server.")
 
@@ -22,36 +44,116 @@ class SearchResults(BaseModel):
 @mcp.tool()  # no output_schema parameter
 async def search(query: str) -> SearchResults:
     """
-    Perform a keyword search and return matching documents.
+    Perform a keyword search and return the best matching documents, ranked by BM25.
+    Wrap words in double quotes to require them as an exact phrase.
     """
-    q = query.lower()
-    hits = [
-        SearchHit(
-            id=r["id"],
-            title=r["title"],
-            text=r["text"][:160],
+    snapshot = CORPUS.current
+    if SEARCH_CACHE.version != snapshot.version:
+        SEARCH_CACHE.bump_version(snapshot.version)
+    key = normalize_query(query, TOP_K)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return cached
+    terms, phrases = parse_query(query)
+    terms = terms + [t for p in phrases for t in p]
+    hits = []
+    for _, doc_id in snapshot.search(query, TOP_K):
+        hits.append(SearchHit(
+            id=doc_id,
+            title=snapshot.title(doc_id),
+            text=snapshot.snippet(doc_id, SNIPPET_CHARS, terms),
             url=None,       # include url even if None to satisfy the spec
-        )
-        for r in RECORDS
-        if q in r["title"].lower() or q in r["text"].lower()
-    ]
-    return SearchResults(results=hits)
+        ))
+    results = SearchResults(results=hits)
+    SEARCH_CACHE.put(key, results)
+    return results
+
+@mcp.resource("stats://search-cache")
+def search_cache_stats() -> dict:
+    """
+    Hit/miss counters and size of the search result cache.
+    """
+    return SEARCH_CACHE.stats()
 
 class Document(BaseModel):
     id: str
     title: str
     text: str
     url: Optional[str] = None
+    offset: int = 0  # where `text` starts in the full text (characters)
+    total_length: int = 0
+    chunk_count: int = 1
+    next_offset: Optional[int] = None  # pass as `offset` to continue; None once the end is reached
 
 @mcp.tool()
-async def fetch(id: str) -> Document:
+async def fetch(id: str, offset: int = 0, length: Optional[int] = None, chunk: Optional[int] = None) -> Document:
     """
-    Retrieve the full document by ID.
+    Retrieve a document by ID. Long texts are returned in pieces: pass `offset`
+    and `length` (in characters) or a `chunk` index (0 to chunk_count - 1), and
+    follow `next_offset` to read on.
     """
-    if id not in LOOKUP:
+    snapshot = CORPUS.current
+    if id not in snapshot:
         raise ValueError("unknown id")
-    rec = LOOKUP[id]
-    return Document(id=rec["id"], title=rec["title"], text=rec["text"], url=None)
+    offsets = snapshot.chunk_offsets(id)
+    total = offsets[-1]
+    if chunk is not None:
+        if not 0 <= chunk < len(offsets) - 1:
+            raise ValueError(f"chunk must be between 0 and {len(offsets) - 2}")
+        offset, length = offsets[chunk], offsets[chunk + 1] - offsets[chunk]
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must not be negative")
+    length = MAX_FETCH_CHARS if length is None else min(length, MAX_FETCH_CHARS)
+    text = snapshot.text_range(id, offset, length)
+    end = min(offset, total) + len(text)
+    rec = snapshot.get(id, ("title", "url"))
+    return Document(
+        id=rec["id"], title=rec["title"], text=text, url=rec["url"],
+        offset=offset, total_length=total, chunk_count=len(offsets) - 1,
+        next_offset=end if end < total else None,
+    )
+
+class PartialDocument(BaseModel):
+    id: str
+    title: Optional[str] = None
+    text: Optional[str] = None
+    url: Optional[str] = None
+    total_length: Optional[int] = None  # set when text was requested
+    next_offset: Optional[int] = None  # pass to fetch as `offset` when text was cut short
+
+class DocumentBatch(BaseModel):
+    documents: List[PartialDocument]
+    missing: List[str] = []
+
+@mcp.tool()
+async def fetch_many(ids: List[str], fields: Optional[List[str]] = None) -> DocumentBatch:
+    """
+    Retrieve several documents by ID in one call. `fields` picks which of
+    title, text and url to return (all of them by default); unknown IDs are
+    listed in `missing` instead of failing the call. Each text is cut to its
+    first MAX_BATCH_TEXT_CHARS characters; `next_offset` says where fetch
+    continues when it was.
+    """
+    if len(ids) > MAX_BATCH:
+        raise ValueError(f"at most {MAX_BATCH} ids per call")
+    fields = FIELDS if fields is None else fields
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"unknown fields: {sorted(unknown)}")
+    snapshot = CORPUS.current
+    documents, missing = [], []
+    for doc_id in ids:
+        if doc_id in snapshot:
+            doc = snapshot.get(doc_id, [f for f in fields if f != "text"])
+            if "text" in fields:
+                total = snapshot.text_length(doc_id)
+                doc["text"] = snapshot.text_range(doc_id, 0, MAX_BATCH_TEXT_CHARS)
+                doc["total_length"] = total
+                doc["next_offset"] = len(doc["text"]) if len(doc["text"]) < total else None
+            documents.append(PartialDocument(**doc))
+        else:
+            missing.append(doc_id)
+    return DocumentBatch(documents=documents, missing=missing)
 
 if __name__ == "__main__":
     # SSE transport on /sse/, as requested
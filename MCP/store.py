@@ -0,0 +1,390 @@
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from index import IndexWriter
+
+MAGIC = b"MCPSTOR3"
+CHUNK_MAGIC = b"MCPCHNK1"
+HEADER = struct.Struct("<8sQ")  # magic, count
+IDX_HEADER = struct.Struct("<8sQQQQ")  # magic, documents, source size, source mtime (ns), shadowed
+SIDECARS = (".dat", ".idx", ".chk", ".del", ".pst")
+FIELDS = ("title", "text", "url")
+CHUNK_CHARS = 4000  # target chunk size; chunks end on a paragraph, line or word break when possible
+SNIPPET_SCAN_CHUNKS = 8  # chunks searched for query terms before falling back to the start
+
+
+def chunk_boundaries(text: str, size: int = CHUNK_CHARS) -> List[int]:
+    """Character offsets splitting `text` into chunks of at most `size`, plus len(text) at the end."""
+    bounds = [0]
+    start = 0
+    while len(text) - start > size:
+        end = start + size
+        for sep in ("\n\n", "\n", " "):
+            cut = text.rfind(sep, start + size // 2, end)
+            if cut != -1:
+                end = cut + len(sep)
+                break
+        bounds.append(end)
+        start = end
+    bounds.append(len(text))
+    return bounds
+
+
+def source_stamp(path: str) -> Tuple[int, int]:
+    """(size, mtime in ns) of a source file; a store compiled from it records this."""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def remove_store(prefix: str) -> None:
+    """Deletes the compiled files of a store (the source `.jsonl` is left alone)."""
+    for ext in SIDECARS:
+        try:
+            os.remove(prefix + ext)
+        except FileNotFoundError:
+            pass
+
+
+class _ChunkedText:
+    """Ranged reads and query-centred snippets on top of chunk_offsets()/text_range()."""
+
+    def chunk_offsets(self, doc_id: str) -> Sequence[int]:
+        raise NotImplementedError
+
+    def text_range(self, doc_id: str, offset: int, length: int) -> str:
+        raise NotImplementedError
+
+    def text_length(self, doc_id: str) -> int:
+        return self.chunk_offsets(doc_id)[-1]
+
+    def snippet(self, doc_id: str, length: int = 160, terms: Iterable[str] = ()) -> str:
+        """`length` characters of text around the chunk matching the most distinct query
+        terms, or the opening ones. Up to SNIPPET_SCAN_CHUNKS chunks are searched,
+        stopping at the first one that has every term."""
+        terms = sorted({t.lower() for t in terms}, key=len, reverse=True)
+        if terms:
+            pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE)
+            offsets = self.chunk_offsets(doc_id)
+            best, best_score = None, (0, 0)
+            for i in range(min(len(offsets) - 1, SNIPPET_SCAN_CHUNKS)):
+                chunk = self.text_range(doc_id, offsets[i], offsets[i + 1] - offsets[i])
+                matches = list(pattern.finditer(chunk))
+                score = (len({m.group().lower() for m in matches}), len(matches))
+                if score > best_score:
+                    best, best_score = offsets[i] + matches[0].start(), score
+                    if score[0] == len(terms):
+                        break
+            if best is not None:
+                start = max(0, best - length // 4)  # some lead-in before the first match
+                if start == 0:
+                    return self.text_range(doc_id, 0, length)
+                text = self.text_range(doc_id, start - 1, length + 1)
+                if text[0].isspace():  # the cut falls between words
+                    return text[1:]
+                space = text.find(" ", 1, best - start + 1)  # drop the partial word we cut into
+                return text[space + 1:] if space != -1 else text[1:]
+        return self.text_range(doc_id, 0, length)
+
+
+class MemoryStore(_ChunkedText):
+    """Documents held in a list of dicts (the demo RECORDS)."""
+
+    def __init__(self, records: Iterable[Dict]):
+        self._records = {r["id"]: r for r in records}
+        self._docnos = {doc_id: i for i, doc_id in enumerate(self._records)}
+        self._chunks: Dict[str, List[int]] = {}
+        self.deleted = frozenset()
+        self.shadowed = frozenset()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._records
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._records)
+
+    def docno(self, doc_id: str) -> Optional[int]:
+        return self._docnos.get(doc_id)
+
+    def get(self, doc_id: str, fields: Iterable[str] = FIELDS) -> Dict:
+        r = self._records[doc_id]
+        return {"id": doc_id, **{f: r.get(f) for f in fields}}
+
+    def title(self, doc_id: str) -> str:
+        return self._records[doc_id]["title"]
+
+    def chunk_offsets(self, doc_id: str) -> List[int]:
+        if doc_id not in self._chunks:
+            self._chunks[doc_id] = chunk_boundaries(self._records[doc_id]["text"])
+        return self._chunks[doc_id]
+
+    def text_range(self, doc_id: str, offset: int, length: int) -> str:
+        return self._records[doc_id]["text"][offset:offset + length]
+
+    def iter_docs(self) -> Iterator[Tuple[str, str, str]]:
+        for r in self._records.values():
+            yield r["id"], r["title"], r["text"]
+
+
+class _IdTable(Sequence):
+    """Document ids by doc number, decoded from the mapped `.idx` on access."""
+
+    def __init__(self, store: "DiskStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store._n
+
+    def __getitem__(self, docno):
+        if isinstance(docno, slice):
+            return [self[i] for i in range(*docno.indices(len(self)))]
+        if not -len(self) <= docno < len(self):
+            raise IndexError(docno)
+        return self._store._id(docno % len(self)).decode("utf-8")
+
+
+class DiskStore(_ChunkedText):
+    """Read-only documents in a memory-mapped `.dat` file, located through a `.idx` file.
+
+    `.dat` holds every document's title, text and url as UTF-8, back to back.
+    `.idx` holds a header (with the size and mtime of the `.jsonl` it was compiled
+    from, see `source_stamp`), then uint64 tables: 3n + 1 field boundaries into
+    `.dat`, n + 1 offsets of each id in the id blob, the n doc numbers ordered by
+    (id, doc number), and the shadowed doc numbers; then the ids as UTF-8, back to
+    back. Everything is read in place from the mapping and ids are found by binary
+    search, so opening a store costs the same for any corpus size and the page
+    cache (not the process) holds it.
+
+    `.chk` holds each document's chunk boundaries as both byte and character
+    offsets into its text, so a character range is served by decoding only the
+    chunks it overlaps.
+
+    `deleted` holds the ids the corpus marked {"id": ..., "deleted": true}, read from
+    an optional `.del` file; they matter when this store is a segment shadowing older ones.
+    `shadowed` holds the doc numbers of ids that appear again later in the same store.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._idx_file = open(prefix + ".idx", "rb")
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, size, mtime_ns, shadowed = IDX_HEADER.unpack_from(self._idx)
+        if magic != MAGIC:
+            raise ValueError(f"{prefix}.idx is not a document store index")
+        self.source_stamp = (size, mtime_ns)
+        self._n = n
+        table = memoryview(self._idx)[IDX_HEADER.size:IDX_HEADER.size + 8 * (5 * n + 2 + shadowed)].cast("Q")
+        self._bounds = table[:3 * n + 1]
+        self._id_offsets = table[3 * n + 1:4 * n + 2]
+        self._sorted = table[4 * n + 2:5 * n + 2]
+        self.shadowed = frozenset(table[5 * n + 2:])
+        self._table = table
+        self._ids_at = IDX_HEADER.size + 8 * len(table)
+        self.ids = _IdTable(self)
+        self.deleted = frozenset()
+        if os.path.exists(prefix + ".del"):
+            with open(prefix + ".del", encoding="utf-8") as f:
+                self.deleted = frozenset(f.read().split("\n")) - {""}
+
+        self._dat_file = open(prefix + ".dat", "rb")
+        size = os.fstat(self._dat_file.fileno()).st_size
+        self._dat = mmap.mmap(self._dat_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+        self._chk_file = open(prefix + ".chk", "rb")
+        self._chk = mmap.mmap(self._chk_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, m = HEADER.unpack_from(self._chk)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"{prefix}.chk is not a chunk index")
+        table = memoryview(self._chk)[HEADER.size:].cast("Q")
+        self._doc_chunks = table[:n + 1]  # per doc, where its offsets start in the two arrays below
+        self._chunk_bytes = table[n + 1:n + 1 + m]
+        self._chunk_chars = table[n + 1 + m:n + 1 + 2 * m]
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.docno(doc_id) is not None
+
+    def _id(self, docno: int) -> bytes:
+        return self._idx[self._ids_at + self._id_offsets[docno]:self._ids_at + self._id_offsets[docno + 1]]
+
+    def docno(self, doc_id: str) -> Optional[int]:
+        """The doc number of `doc_id` (its last occurrence), or None."""
+        key = doc_id.encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:  # first entry past every (key, docno)
+            mid = (lo + hi) // 2
+            if key < self._id(self._sorted[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo and self._id(self._sorted[lo - 1]) == key:
+            return self._sorted[lo - 1]
+        return None
+
+    def _docno(self, doc_id: str) -> int:
+        docno = self.docno(doc_id)
+        if docno is None:
+            raise KeyError(doc_id)
+        return docno
+
+    def _field(self, docno: int, field: int) -> str:
+        start, end = self._bounds[3 * docno + field], self._bounds[3 * docno + field + 1]
+        return self._dat[start:end].decode("utf-8", errors="ignore")
+
+    def get(self, doc_id: str, fields: Iterable[str] = FIELDS) -> Dict:
+        """The document as a dict; only the requested `fields` are decoded from disk."""
+        docno = self._docno(doc_id)
+        doc = {"id": doc_id}
+        for f in fields:
+            doc[f] = self._field(docno, FIELDS.index(f)) or (None if f == "url" else "")
+        return doc
+
+    def title(self, doc_id: str) -> str:
+        return self._field(self._docno(doc_id), 0)
+
+    def chunk_offsets(self, doc_id: str) -> Sequence[int]:
+        docno = self._docno(doc_id)
+        return self._chunk_chars[self._doc_chunks[docno]:self._doc_chunks[docno + 1]]
+
+    def text_range(self, doc_id: str, offset: int, length: int) -> str:
+        docno = self._docno(doc_id)
+        lo, hi = self._doc_chunks[docno], self._doc_chunks[docno + 1]
+        chars, byte_offsets = self._chunk_chars[lo:hi], self._chunk_bytes[lo:hi]
+        offset = min(max(offset, 0), chars[-1])
+        end = min(offset + max(length, 0), chars[-1])
+        first = max(bisect_right(chars, offset) - 1, 0)
+        last = bisect_left(chars, end)
+        base = self._bounds[3 * docno + 1]
+        text = self._dat[base + byte_offsets[first]:base + byte_offsets[last]].decode("utf-8")
+        return text[offset - chars[first]:end - chars[first]]
+
+    def iter_docs(self) -> Iterator[Tuple[str, str, str]]:
+        for docno, doc_id in enumerate(self.ids):
+            yield doc_id, self._field(docno, 0), self._field(docno, 1)
+
+    def close(self) -> None:
+        for view in (self._doc_chunks, self._chunk_bytes, self._chunk_chars):
+            view.release()
+        self._chk.close()
+        self._chk_file.close()
+        for view in (self._bounds, self._id_offsets, self._sorted, self._table):
+            view.release()
+        self._idx.close()
+        self._idx_file.close()
+        if self._dat:
+            self._dat.close()
+        self._dat_file.close()
+
+
+def build_store(jsonl_path: str, prefix: str) -> None:
+    """Compiles a JSONL corpus ({"id", "title", "text", "url"?} per line) into `prefix`.dat/.idx.
+
+    Streams the input, so memory use is bounded by the id list, not the corpus.
+    Only compiling needs the id list; DiskStore reads it from `.idx` in place.
+    Lines with "deleted": true are tombstones and go to `prefix`.del instead.
+    Chunk boundaries of every text go to `prefix`.chk, and the search postings
+    to `prefix`.pst (see index.IndexWriter).
+
+    The source is stat'ed before it is read, so lines appended during the build
+    leave the recorded stamp behind the file and the next open_store rebuilds.
+    """
+    stamp = source_stamp(jsonl_path)
+    bounds = array("Q", [0])
+    doc_chunks, chunk_bytes, chunk_chars = array("Q", [0]), array("Q"), array("Q")
+    ids = []
+    deleted = []
+    postings = IndexWriter(prefix + ".pst.tmp")
+    with open(jsonl_path, encoding="utf-8") as src, open(prefix + ".dat.tmp", "wb") as dat:
+        offset = 0
+        for line in src:
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            doc_id = str(rec["id"])
+            if "\n" in doc_id:
+                raise ValueError(f"document id contains a newline: {doc_id!r}")
+            if rec.get("deleted"):
+                deleted.append(doc_id)
+                continue
+            ids.append(doc_id)
+            text = rec.get("text") or ""
+            postings.add(rec.get("title") or "", text)
+            chars = chunk_boundaries(text)
+            byte_offset = 0
+            for i, c in enumerate(chars):
+                if i:
+                    byte_offset += len(text[chars[i - 1]:c].encode("utf-8"))
+                chunk_bytes.append(byte_offset)
+                chunk_chars.append(c)
+            doc_chunks.append(len(chunk_chars))
+            for field in FIELDS:
+                data = (rec.get(field) or "").encode("utf-8")
+                dat.write(data)
+                offset += len(data)
+                bounds.append(offset)
+    postings.close()
+    encoded = [doc_id.encode("utf-8") for doc_id in ids]
+    ordered = sorted(range(len(ids)), key=lambda docno: (encoded[docno], docno))
+    last = {doc_id: docno for docno, doc_id in enumerate(encoded)}
+    shadowed = array("Q", (docno for docno, doc_id in enumerate(encoded) if last[doc_id] != docno))
+    del last
+    with open(prefix + ".idx.tmp", "wb") as idx:
+        idx.write(IDX_HEADER.pack(MAGIC, len(ids), *stamp, len(shadowed)))
+        idx.write(bounds.tobytes())
+        idx.write(array("Q", accumulate(map(len, encoded), initial=0)).tobytes())
+        idx.write(array("Q", ordered).tobytes())
+        idx.write(shadowed.tobytes())
+        idx.write(b"".join(encoded))
+    with open(prefix + ".chk.tmp", "wb") as chk:
+        chk.write(HEADER.pack(CHUNK_MAGIC, len(chunk_chars)))
+        for table in (doc_chunks, chunk_bytes, chunk_chars):
+            chk.write(table.tobytes())
+    if deleted:
+        with open(prefix + ".del", "w", encoding="utf-8") as f:
+            f.write("\n".join(deleted))
+    elif os.path.exists(prefix + ".del"):
+        os.remove(prefix + ".del")
+    os.replace(prefix + ".dat.tmp", prefix + ".dat")
+    os.replace(prefix + ".chk.tmp", prefix + ".chk")
+    os.replace(prefix + ".pst.tmp", prefix + ".pst")
+    os.replace(prefix + ".idx.tmp", prefix + ".idx")
+
+
+def _compiled_stamp(prefix: str) -> Optional[Tuple[int, int]]:
+    """The source stamp recorded in `prefix`.idx, or None if it's missing or from another format."""
+    try:
+        with open(prefix + ".idx", "rb") as f:
+            magic, _, size, mtime_ns, _ = IDX_HEADER.unpack(f.read(IDX_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return (size, mtime_ns) if magic == MAGIC else None
+
+
+def open_store(path: str) -> DiskStore:
+    """Opens a corpus given as a `.jsonl` file (compiled next to it when missing or stale)
+    or as the prefix of existing `.dat`/`.idx`/`.chk`/`.pst` files.
+
+    The compiled files are stale when the size or mtime recorded in `.idx` no
+    longer matches the `.jsonl`."""
+    if path.endswith(".jsonl"):
+        prefix = path[: -len(".jsonl")]
+        if (
+            _compiled_stamp(prefix) != source_stamp(path)
+            or not os.path.exists(prefix + ".chk")
+            or not os.path.exists(prefix + ".pst")
+        ):
+            build_store(path, prefix)
+        path = prefix
+    return DiskStore(path)